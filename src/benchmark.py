@@ -0,0 +1,370 @@
+# benchmark for the hot paths of the complexity measures on synthetic GraphVar-like data
+# synthetic conllup files use the columns of src/graphvar.conf and random constituency trees in the BIO format of the SYNTAX column
+# results (seconds, tokens per second, peak memory) are written as JSON and can be compared with a stored baseline
+
+# usage (call from root dir):
+# python3 src/benchmark.py --docs 20 --tokens 2000 --depth 8 --save data_tmp/benchmarks/baseline.json
+# python3 src/benchmark.py --docs 20 --tokens 2000 --depth 8 --compare data_tmp/benchmarks/baseline.json
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from functions import make_df_dict, read_conllup
+from calc_syn_complexity import SynComplMeas, TextMemo, FEATURES
+import lex_diversity
+import ngram_model
+
+# node labels and POS tags used for the synthetic trees, with weights from the frequencies of the node labels and XPOS tags in the demo data
+CLAUSE_LABELS = {"SIMPX": 649, "R-SIMPX": 75, "P-SIMPX": 12}
+FIELD_LABELS = {"VF": 410, "LK": 450, "MF": 720, "VC": 450, "NF": 250, "C": 240, "FKONJ": 115, "FKOORD": 66}
+PHRASE_LABELS = {"NX": 2470, "PX": 478, "VXFIN": 690, "VXINF": 254, "ADJX": 500, "ADVX": 400}
+POS_TAGS = {"NN": 1133, "ART": 622, "$,": 419, "APPR": 415, "$(": 370, "VVFIN": 356, "$.": 353, "ADV": 335, "PPER": 315, "NE": 253, "KON": 236,
+            "VAFIN": 226, "ADJA": 221, "ADJD": 180, "VVINF": 160, "KOUS": 134, "PPOSAT": 127, "VVPP": 100, "PRF": 88, "PIAT": 79, "VMFIN": 78,
+            "CARD": 72, "PRELS": 69, "PTKNEG": 61, "APPRART": 48, "KOKOM": 45, "PTKZU": 45, "PTKVZ": 43, "PIS": 37, "PDAT": 35}
+
+
+def choose(rng, weights: dict):
+    """
+    Function that draws one label with probabilities proportional to the weights.
+
+        Input:
+            1. rng (numpy.random.Generator): Random number generator
+            2. weights (dict): Dictionary with key = label (str) and value = weight (int)
+        Output:
+            1. label (str): Drawn label"""
+
+    labels = list(weights)
+    probs = np.array(list(weights.values()), dtype=np.float64)
+
+    return labels[rng.choice(len(labels), p=probs/probs.sum())]
+
+
+def read_columns(conf="src/graphvar.conf"):
+    """
+    Function that reads the column names of the GraphVar conllup files.
+
+        Input:
+            1. conf (str): Path to the column configuration (one column name per line)
+        Output:
+            1. columns (list): Column names (str)"""
+
+    with open(conf, "r", encoding="UTF-8") as file:
+        columns = [line.strip() for line in file if line.strip()]
+
+    return columns
+
+
+def make_tree_tags(rng, n_tokens: int, max_depth: int):
+    """
+    Function that creates a random constituency tree over n_tokens tokens and returns the node tags of each token in the format of the SYNTAX column.
+    Nodes covering several tokens get B-, I- and E- tags, one-token nodes get the bare label.
+
+        Input:
+            1. rng (numpy.random.Generator): Random number generator
+            2. n_tokens (int): Number of tokens of the sentence
+            3. max_depth (int): Maximum embedding depth of the tree
+        Output:
+            1. tags (list): List with one list of node tags (str) per token"""
+
+    tags = [list() for _ in range(n_tokens)]
+
+    def add_node(start, end, depth, kind):
+        # clauses consist of fields, fields of phrases (the final field NF often of a clause), phrases of phrases or sometimes of a relative clause
+        if kind == "clause":
+            label = choose(rng, CLAUSE_LABELS) if depth else "SIMPX"
+            child_kind = "field"
+        elif kind == "field":
+            label = choose(rng, FIELD_LABELS)
+            child_kind = "clause" if label == "NF" else "phrase"
+        else:
+            label = choose(rng, PHRASE_LABELS)
+            child_kind = "clause" if rng.random() < 0.1 else "phrase"
+
+        for tok in range(start, end):
+            if end - start == 1:
+                tags[tok].append(label)
+            elif tok == start:
+                tags[tok].append("B-" + label)
+            elif tok == end - 1:
+                tags[tok].append("E-" + label)
+            else:
+                tags[tok].append("I-" + label)
+
+        # split the span into up to three children
+        if depth + 1 < max_depth and end - start > 1:
+            cuts = sorted(set(rng.integers(start + 1, end, size=min(2, end - start - 1)).tolist()))
+            bounds = [start] + cuts + [end]
+            for child_start, child_end in zip(bounds[:-1], bounds[1:]):
+                add_node(child_start, child_end, depth + 1, child_kind)
+
+    add_node(0, n_tokens, 0, "clause")
+
+    return tags
+
+
+def write_synthetic_corpus(out_dir: str, n_docs: int, n_tokens: int, max_depth: int, seed=0):
+    """
+    Function that writes synthetic conllup files with the GraphVar columns (including headlines, <EMPTY> rows and words split into <B->/<E-> rows).
+
+        Input:
+            1. out_dir (str): Directory for the files
+            2. n_docs (int): Number of files
+            3. n_tokens (int): Approximate number of tokens per file
+            4. max_depth (int): Maximum embedding depth of the trees
+            5. seed (int): Seed of the random number generator
+        Output:
+            1. filenames (list): Filenames of the written files (str)"""
+
+    rng = np.random.default_rng(seed)
+    columns = read_columns()
+    filenames = list()
+
+    for doc in range(n_docs):
+        # alternate between two years, so that results are aggregated over several texts per year
+        filename = "%d_DE_SYN_%02d_M_00P.conllup" % (1963 + 50*(doc % 2), doc)
+        filenames.append(filename)
+        lines = ["# global.columns = " + " ".join(columns)]
+        written = 0
+        sent_no = 0
+
+        while written < n_tokens:
+            sent_no += 1
+            sent_len = int(rng.integers(5, 40))
+            tags = make_tree_tags(rng, sent_len, max_depth)
+            lines.append("# sent_id = %d" % sent_no)
+
+            for tok, tok_tags in enumerate(tags):
+                pos = choose(rng, POS_TAGS)
+                row = dict.fromkeys(columns, "_")
+                row.update({"ID": str(tok + 1), "FORM": "w%d" % rng.integers(2000), "XPOS": pos, "UEBERSCHRIFT": "0",
+                            "SYNTAX": "|".join(tok_tags + [pos])})
+                row["LEMMA"] = row["FORM"]
+                # first sentence is a headline, some rows are empty or parts of a split word
+                if sent_no == 1:
+                    row["UEBERSCHRIFT"] = "B-1"
+                elif rng.random() < 0.01:
+                    row["FORM"] = "<EMPTY>"
+                elif rng.random() < 0.01:
+                    row["FORM"] = "<E->" + row["FORM"]
+                lines.append("\t".join(row[col] for col in columns))
+
+            lines.append("")
+            written += sent_len
+
+        with open(os.path.join(out_dir, filename), "w", encoding="UTF-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+    return filenames
+
+
+def measure(func, repeat=3):
+    """
+    Function that runs func several times and returns the fastest wall time and the peak memory of the first run.
+
+        Input:
+            1. func (function): Function without arguments
+            2. repeat (int): Number of runs
+        Output:
+            1. seconds (float): Fastest wall time in seconds
+            2. peak_mb (float): Peak memory allocated during the first run in MB"""
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    times = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return min(times), peak / 2**20
+
+
+def syntax_benchmarks(path: str, filenames: list):
+    """
+    Function that returns the benchmarks for loading the data, the shared steps of the syntactic complexity features (derived columns of TextMemo,
+    pattern counts of the feature registry) and every registered feature (calculated alone, like SynComplMeas(..., lazy=True) does for one feature).
+
+        Input:
+            1. path (str): Directory of the synthetic conllup files
+            2. filenames (list): Filenames (str)
+        Output:
+            1. benchmarks (dict): Dictionary with key = benchmark name (str) and value = function without arguments"""
+
+    df_dict = make_df_dict(path, filenames)
+    dfs = list(df_dict.values())
+    syns = [TextMemo(df).syn for df in dfs]
+
+    benchmarks = {
+        "make_df_dict": lambda: make_df_dict(path, filenames),
+        "SynComplMeas": lambda: SynComplMeas("benchmark", df_dict),
+        "calc_text_features": lambda: [SynComplMeas.calc_text_features(df) for df in dfs],
+        "TextMemo.syn": lambda: [TextMemo(df).syn for df in dfs],
+        "TextMemo.depths": lambda: [TextMemo(df).depths for df in dfs],
+        "TextMemo.sent_depths": lambda: [TextMemo(df).sent_depths for df in dfs],
+        "TextMemo.xpos_counts": lambda: [TextMemo(df).xpos_counts for df in dfs],
+        "count_patterns": lambda: [FEATURES.count_patterns(syn) for syn in syns],
+    }
+
+    # every feature alone, with all steps it needs
+    for feat_name in SynComplMeas.feature_names:
+        benchmarks["feature:" + feat_name] = lambda feat_name=feat_name: [SynComplMeas.calc_text_features(df, features=[feat_name]) for df in dfs]
+
+    return benchmarks
+
+
+def lexical_benchmarks(path: str, filenames: list):
+    """
+    Function that returns the benchmarks for the lexical diversity measures.
+
+        Input:
+            1. path (str): Directory of the synthetic conllup files
+            2. filenames (list): Filenames (str)
+        Output:
+            1. benchmarks (dict): Dictionary with key = benchmark name (str) and value = function without arguments"""
+
+    lemma_lists = [read_conllup(path+filename, columns=["LEMMA"]).LEMMA.tolist() for filename in filenames]
+
+    benchmarks = {
+        "MATTR": lambda: lex_diversity.batch_MATTR(lemma_lists, windows=(500,)),
+        "HDD": lambda: lex_diversity.batch_HDD(lemma_lists, samples=(42,)),
+        "lex_diversity": lambda: lex_diversity.batch_lex_diversity(lemma_lists),
+    }
+
+    return benchmarks
+
+
+def perplexity_benchmarks(path: str, filenames: list):
+    """
+    Function that returns the benchmarks for the POS n-gram models. The XPOS tags of the synthetic files are written as tagged files (one sentence per line).
+
+        Input:
+            1. path (str): Directory of the synthetic conllup files
+            2. filenames (list): Filenames (str)
+        Output:
+            1. benchmarks (dict): Dictionary with key = benchmark name (str) and value = function without arguments"""
+
+    filepaths = list()
+    for filename in filenames:
+        df = read_conllup(path+filename, columns=["SENT_ID", "XPOS"])
+        filepaths.append(path + filename.replace(".conllup", ".spl"))
+        with open(filepaths[-1], "w", encoding="UTF-8") as outfile:
+            outfile.write("\n".join(df.groupby("SENT_ID").XPOS.agg(" ".join)) + "\n")
+
+    vocab = ngram_model.TagVocab()
+    model = ngram_model.BigramModel.from_files(filepaths, vocab)
+    test_ids = [ngram_model.pad_sentences(ngram_model.iter_sentences([filepath]), vocab, add=False) for filepath in filepaths]
+
+    kn_model = ngram_model.KneserNeyModel.from_files(filepaths, order=4)
+
+    benchmarks = {
+        "BigramModel": lambda: ngram_model.BigramModel.from_files(filepaths),
+        "KneserNeyModel_4gram": lambda: ngram_model.KneserNeyModel.from_files(filepaths, order=4),
+        "kn_perplexity_4gram": lambda: [kn_model.perplexity(ngram_model.iter_sentences([filepath])) for filepath in filepaths],
+        "perplexity": lambda: [model.perplexity(ids, 2500) for ids in test_ids],
+        "batch_perplexity": lambda: ngram_model.batch_perplexity(*ngram_model.encode_bigram_counts(test_ids, vocab, 2500),
+                                                                 ngram_model.stack_log_probs([model, model], vocab)),
+    }
+
+    return benchmarks
+
+
+def run_benchmarks(n_docs: int, n_tokens: int, max_depth: int, repeat=3, only=None):
+    """
+    Function that writes a synthetic corpus into a temporary directory and runs all benchmarks on it.
+
+        Input:
+            1. n_docs (int): Number of files
+            2. n_tokens (int): Approximate number of tokens per file
+            3. max_depth (int): Maximum embedding depth of the trees
+            4. repeat (int): Number of timed runs per benchmark
+            5. only (list): Names of the benchmarks to run (str), None for all
+        Output:
+            1. report (dict): Configuration and results with seconds, tokens per second and peak memory per benchmark"""
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = tmp_dir + "/"
+        filenames = write_synthetic_corpus(path, n_docs, n_tokens, max_depth)
+        tok_count = sum(len(df) for df in make_df_dict(path, filenames).values())
+
+        benchmarks = syntax_benchmarks(path, filenames)
+        benchmarks.update(lexical_benchmarks(path, filenames))
+        benchmarks.update(perplexity_benchmarks(path, filenames))
+
+        results = dict()
+        for name, func in benchmarks.items():
+            if only and name not in only:
+                continue
+            seconds, peak_mb = measure(func, repeat)
+            results[name] = {"seconds": seconds, "tokens_per_sec": tok_count / seconds, "peak_mb": peak_mb}
+
+    report = {"config": {"docs": n_docs, "tokens": n_tokens, "depth": max_depth, "corpus_tokens": tok_count}, "results": results}
+
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance: float):
+    """
+    Function that compares benchmark results with a baseline and returns the names of benchmarks that are slower than tolerance times the baseline.
+
+        Input:
+            1. report (dict): Current results (see run_benchmarks)
+            2. baseline (dict): Stored results
+            3. tolerance (float): Allowed slowdown factor, e.g. 1.25
+        Output:
+            1. regressions (list): Names of the slower benchmarks (str)"""
+
+    if report["config"] != baseline["config"]:
+        print("warning: configuration differs from baseline", baseline["config"])
+
+    regressions = list()
+    for name, result in report["results"].items():
+        if name not in baseline["results"]:
+            continue
+        ratio = result["seconds"] / baseline["results"][name]["seconds"]
+        flag = "REGRESSION" if ratio > tolerance else ""
+        print("%-28s %8.3fx baseline %s" % (name, ratio, flag))
+        if ratio > tolerance:
+            regressions.append(name)
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the complexity measures on synthetic data.")
+    parser.add_argument("--docs", type=int, default=20, help="number of synthetic texts")
+    parser.add_argument("--tokens", type=int, default=2000, help="tokens per text")
+    parser.add_argument("--depth", type=int, default=8, help="maximum embedding depth of the trees")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark")
+    parser.add_argument("--only", nargs="*", help="names of the benchmarks to run")
+    parser.add_argument("--save", help="write results as JSON baseline to this file")
+    parser.add_argument("--compare", help="compare results with this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="allowed slowdown compared to the baseline")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.docs, args.tokens, args.depth, args.repeat, args.only)
+
+    print("corpus tokens:", report["config"]["corpus_tokens"])
+    for name, result in report["results"].items():
+        print("%-28s %10.4f s %14.0f tok/s %10.2f MB" % (name, result["seconds"], result["tokens_per_sec"], result["peak_mb"]))
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w", encoding="UTF-8") as outfile:
+            json.dump(report, outfile, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="UTF-8") as infile:
+            baseline = json.load(infile)
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
@@ -40,6 +40,24 @@ def read_data(path):
 
 	return data, years, df
 
+def read_store_data(feature, store_file="results/results.parquet", corpus="abitur", split="test"):
+	"""function that reads data for plotting out of the result store (see result_store.py), returns the same as read_data"""
+
+	sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+	from result_store import read_results, read_year_stats
+
+	# text values of the feature, only the needed columns are read
+	df_vals = read_results(store_file, corpus, split, [feature], columns=["YEAR", "DOC", "VALUE"]).sort_values(["YEAR", "DOC"], kind="stable")
+
+	#one list of values per year
+	grouped = df_vals.groupby("YEAR", sort=True).VALUE
+	data = [list(values) for _, values in grouped]
+	years = list(grouped.groups)
+
+	df = read_year_stats(store_file, corpus, split, [feature]).drop(columns="FEATURE")
+
+	return data, years, df
+
 def get_min_max(arrays):
 	"""function that returns the minimum and maximum for arrays within an array"""
 	min_array = []
@@ -0,0 +1,125 @@
+# calculate the lexical diversity measures for the texts of a data split and write per-year results like 1_lexical_diversity.ipynb
+# (results/1_lex/test_results/, results/1_lex_demo/: MTLD.csv, HDD.csv, MATTR.csv with YEAR, YEAR_VAL, STUDENT_VALS, STUDENT_STD)
+
+# usage (call from root dir):
+# python3 src/calc_lex_diversity.py src/demo_dataSplits.csv --out results/1_lex_demo/
+# python3 src/calc_lex_diversity.py src/dataSplits.csv --path data/ --out results/1_lex/test_results/ --workers 8
+
+# import modules
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from functions import get_filenames, read_conllup
+from lex_diversity import compute_lex_diversity
+
+# result files of the measures (MSTTR is not used in the study, see 1_lexical_diversity.ipynb)
+OUTFILES = {"MTLD": "MTLD.csv", "HD-D": "HDD.csv", "MATTR": "MATTR.csv"}
+
+
+######################################
+def read_lemmas(filepath: str):
+    """
+    Function that reads the lemmas of a conllup file without headlines and without the superfluous rows of words that are split into several rows
+    (lemmas containing "<I->" or "<E->", only the "<B->" row is kept). Rows are filtered in one pass, so every row is removed
+    (unlike removing them with list.pop while iterating over the list in 1_lexical_diversity.ipynb, which skips the row after a removed row).
+
+        Input:
+            1. filepath (str): Path to the conllup file
+        Output:
+            1. lemma_list (list): Lemmas of the text (str)"""
+
+    df = read_conllup(filepath, columns=["LEMMA"], skip_empty=False, skip_parts=False)
+
+    lemma_list = [lemma for lemma in df.LEMMA if "<I->" not in lemma and "<E->" not in lemma]
+
+    return lemma_list
+
+
+######################################
+def calc_file_lex(filepath: str, options: dict):
+    """
+    Function that calculates all lexical diversity measures of one file (called in the worker processes).
+
+        Input:
+            1. filepath (str): Path to the conllup file
+            2. options (dict): Keyword arguments of lex_diversity.compute_lex_diversity (window, sample, ...)
+        Output:
+            1. lex_vals (dict): Dictionary with key = measure name (str) and value = measure value (float)"""
+
+    return compute_lex_diversity(read_lemmas(filepath), **options)
+
+
+######################################
+def make_year_df(df_texts: pd.DataFrame, measure: str):
+    """
+    Function that assigns the text values of a measure to the years and calculates mean and standard deviation (sample) per year.
+
+        Input:
+            1. df_texts (Pandas.DataFrame): One row per text with the columns YEAR and the measure values
+            2. measure (str): Name of the measure, e.g. "MTLD"
+        Output:
+            1. df_year (Pandas.DataFrame): Data frame with the columns YEAR, YEAR_VAL, STUDENT_VALS, STUDENT_STD, sorted by years"""
+
+    grouped = df_texts.groupby("YEAR", sort=True)[measure]
+
+    df_year = pd.DataFrame({"YEAR_VAL": grouped.mean(), "STUDENT_VALS": grouped.agg(list), "STUDENT_STD": grouped.std(ddof=1)}).reset_index()
+
+    return df_year
+
+
+######################################
+def calc_lex_diversity(path: str, filenames: list, workers=1, **options):
+    """
+    Function that calculates the lexical diversity measures of all files, optionally in a pool of worker processes (results in the order of filenames).
+
+        Input:
+            1. path (str): Path to the files on the computer
+            2. filenames (list): Filenames of the conllup files (str), starting with the year
+            3. workers (int): Number of worker processes. The default value is 1 (no worker processes)
+            4. options: Keyword arguments of lex_diversity.compute_lex_diversity (window, sample, ...)
+        Output:
+            1. df_texts (Pandas.DataFrame): One row per file with the columns FILENAME, YEAR and one column per measure"""
+
+    filepaths = [path + filename for filename in filenames]
+
+    if workers <= 1:
+        results = [calc_file_lex(filepath, options) for filepath in filepaths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(calc_file_lex, filepaths, [options]*len(filepaths), chunksize=4))
+
+    df_texts = pd.DataFrame(results)
+    df_texts.insert(0, "YEAR", [int(filename[:4]) for filename in filenames])
+    df_texts.insert(0, "FILENAME", filenames)
+
+    return df_texts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calculate lexical diversity measures per year for a data split.")
+    parser.add_argument("splits", help="file with the data split, e.g. src/demo_dataSplits.csv")
+    parser.add_argument("--path", default="data/", help="directory of the conllup files")
+    parser.add_argument("--dev", action="store_true", help="use the development data instead of the test data")
+    parser.add_argument("--out", default="results/1_lex_demo/", help="output directory for the result files")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--window", type=int, default=500, help="window size of MATTR")
+    parser.add_argument("--sample", type=int, default=42, help="sample size of HD-D")
+    args = parser.parse_args()
+
+    filenames = sorted(get_filenames(args.splits, test=not args.dev))
+
+    df_texts = calc_lex_diversity(args.path, filenames, workers=args.workers, window=args.window, sample=args.sample)
+
+    os.makedirs(args.out, exist_ok=True)
+
+    # create .csv for each measure
+    for measure, outfile in OUTFILES.items():
+        df_year = make_year_df(df_texts, measure)
+        print(measure + ":")
+        print(df_year)
+        df_year.to_csv(os.path.join(args.out, outfile), sep=",")
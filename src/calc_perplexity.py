@@ -0,0 +1,146 @@
+# calculate the perplexity of the tagged Abitur texts for POS bigram models of reference corpora and write per-year results like 2_perplexity.ipynb
+# (results/2_perplex_demo/perplexity.csv with YEAR, all_ppl_<model>, mean_ppl_<model>, std_ppl_<model>)
+# all texts are scored against all models at once (see ngram_model.batch_perplexity)
+# with --order 3 (or higher) or --kn, Kneser-Ney models are used instead, which are trained once and saved in data_tmp/perplex/models/
+
+# usage (call from root dir):
+# python3 src/calc_perplexity.py --out results/2_perplex_demo/
+# python3 src/calc_perplexity.py --models ZEIT=data_tmp/perplex/tagged/zeit/ Express=data_tmp/perplex/tagged/express/ --out results/2_perplex/test_results/
+# python3 src/calc_perplexity.py --order 4 --out data_tmp/perplex/results_4gram/
+
+# import modules
+import os
+import sys
+import argparse
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ngram_model import TagVocab, BigramModel, iter_sentences, pad_sentences, encode_bigram_counts, stack_log_probs, batch_perplexity, load_or_train
+
+# number of test bigram types per year, divided evenly among the texts of a year
+BIGRAMS_PER_YEAR = 5000
+
+
+######################################
+def get_test_files(tagged_dir: str):
+    """
+    Function that returns the tagged Abitur texts (files in tagged_dir whose names start with a year), sorted by filename.
+
+        Input:
+            1. tagged_dir (str): Directory of the tagged texts, e.g. "data_tmp/perplex/tagged/"
+        Output:
+            1. filenames (list): Filenames (str)"""
+
+    filenames = sorted(filename for filename in os.listdir(tagged_dir)
+                       if os.path.isfile(os.path.join(tagged_dir, filename)) and filename[:4].isdigit())
+
+    return filenames
+
+
+######################################
+def calc_perplexity(tagged_dir: str, filenames: list, model_dirs: dict, bigrams_per_year=BIGRAMS_PER_YEAR):
+    """
+    Function that builds a bigram model for every reference corpus and calculates the perplexity of every test text for every model.
+    As in 2_perplexity.ipynb, only the first round(bigrams_per_year / number of texts of the year) bigram types of each text are used.
+
+        Input:
+            1. tagged_dir (str): Directory of the tagged test texts
+            2. filenames (list): Filenames of the test texts (str), starting with the year
+            3. model_dirs (dict): Dictionary with key = model name (str) and value = directory of the tagged training files (str)
+            4. bigrams_per_year (int): Number of test bigram types per year. The default value is 5000
+        Output:
+            1. df_texts (Pandas.DataFrame): One row per text with the columns FILENAME, YEAR and one column per model"""
+
+    # shared vocabulary, so that all models and texts use the same tag ids
+    vocab = TagVocab()
+    models = [BigramModel.from_files(model_dir, vocab) for model_dir in model_dirs.values()]
+
+    years = [filename[:4] for filename in filenames]
+    texts_per_year = pd.Series(years).value_counts()
+    max_types = [round(bigrams_per_year / texts_per_year[year]) for year in years]
+
+    texts = [pad_sentences(iter_sentences([os.path.join(tagged_dir, filename)]), vocab, add=False) for filename in filenames]
+    counts, word_counts = encode_bigram_counts(texts, vocab, max_types)
+
+    perpl = batch_perplexity(counts, word_counts, stack_log_probs(models, vocab))
+
+    df_texts = pd.DataFrame(perpl, columns=list(model_dirs))
+    df_texts.insert(0, "YEAR", years)
+    df_texts.insert(0, "FILENAME", filenames)
+
+    return df_texts
+
+
+######################################
+def calc_kn_perplexity(tagged_dir: str, filenames: list, model_dirs: dict, order=3, model_store="data_tmp/perplex/models/"):
+    """
+    Function that calculates the perplexity of every test text for Kneser-Ney models of the reference corpora (all tags of a text are used).
+    Models are loaded from model_store if they were trained on the current files, otherwise they are trained and saved there.
+
+        Input:
+            1. tagged_dir (str): Directory of the tagged test texts
+            2. filenames (list): Filenames of the test texts (str), starting with the year
+            3. model_dirs (dict): Dictionary with key = model name (str) and value = directory of the tagged training files (str)
+            4. order (int): Order of the models. The default value is 3
+            5. model_store (str): Directory of the saved models. The default value is "data_tmp/perplex/models/"
+        Output:
+            1. df_texts (Pandas.DataFrame): One row per text with the columns FILENAME, YEAR and one column per model"""
+
+    df_texts = pd.DataFrame({"FILENAME": filenames, "YEAR": [filename[:4] for filename in filenames]})
+
+    for name, model_dir in model_dirs.items():
+        model = load_or_train(model_dir, os.path.join(model_store, "%s_%dgram" % (name, order)), order)
+        df_texts[name] = [model.perplexity(iter_sentences([os.path.join(tagged_dir, filename)])) for filename in filenames]
+
+    return df_texts
+
+
+######################################
+def make_year_df(df_texts: pd.DataFrame, model_names: list):
+    """
+    Function that assigns the perplexities of the texts to the years and calculates mean and standard deviation (population, as numpy.std) per year and model.
+
+        Input:
+            1. df_texts (Pandas.DataFrame): Result of calc_perplexity
+            2. model_names (list): Names of the models (str)
+        Output:
+            1. df_ppl (Pandas.DataFrame): Data frame with the columns YEAR, all_ppl_<model>, mean_ppl_<model>, std_ppl_<model>"""
+
+    grouped = df_texts.groupby("YEAR", sort=True)
+
+    df_ppl = pd.DataFrame({"YEAR": list(grouped.groups)})
+    for stat, func in [("all", list), ("mean", np.mean), ("std", np.std)]:
+        for name in model_names:
+            df_ppl[stat + "_ppl_" + name] = [func(list(values)) for _, values in grouped[name]]
+
+    return df_ppl
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calculate the perplexity of the tagged Abitur texts per year.")
+    parser.add_argument("--tagged", default="data_tmp/perplex/tagged/", help="directory of the tagged Abitur texts")
+    parser.add_argument("--models", nargs="+", default=["ZEIT=data_tmp/perplex/tagged/zeit/", "Express=data_tmp/perplex/tagged/express/"],
+                        help="models as NAME=DIRECTORY of tagged training files")
+    parser.add_argument("--bigrams", type=int, default=BIGRAMS_PER_YEAR, help="number of test bigram types per year")
+    parser.add_argument("--order", type=int, default=2, help="order of the n-gram models (Kneser-Ney smoothing for orders above 2)")
+    parser.add_argument("--kn", action="store_true", help="use Kneser-Ney smoothing also for bigram models")
+    parser.add_argument("--model-store", default="data_tmp/perplex/models/", help="directory for the saved Kneser-Ney models")
+    parser.add_argument("--out", default="results/2_perplex_demo/", help="output directory for perplexity.csv")
+    args = parser.parse_args()
+
+    model_dirs = dict(model.split("=", 1) for model in args.models)
+    filenames = get_test_files(args.tagged)
+
+    if args.order > 2 or args.kn:
+        df_texts = calc_kn_perplexity(args.tagged, filenames, model_dirs, args.order, args.model_store)
+    else:
+        df_texts = calc_perplexity(args.tagged, filenames, model_dirs, args.bigrams)
+    df_ppl = make_year_df(df_texts, list(model_dirs))
+
+    pd.set_option("max_colwidth", 500)
+    print(df_ppl)
+
+    os.makedirs(args.out, exist_ok=True)
+    df_ppl.to_csv(os.path.join(args.out, "perplexity.csv"), sep=",")
@@ -1,61 +1,474 @@
 # author: Matilda Schauf
 
 # import modules
+import re
+import hashlib
+from collections import deque
+from functools import cached_property
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 
+from syntax_arrays import SyntaxArrays, PREFIXES, NO_PREFIX, B
+from profiling import Profiler, timed
+
+# node labels of the topological fields (VF, MF, NF, LK, LV, KOORD, PARORD, C, VC, FKONJ and variants), not counted for the embedding depths
+TOP_FIELDS = {"VF", "VFE", "MF", "MFE", "NF", "NFE", "LK", "LV", "KOORD", "FKOORD", "PARORD", "C", "CE", "VC", "VCE", "FKONJ"}
+
+# version of the feature calculation, part of the fingerprints of the features (see FeatureRegistry.get_fingerprint)
+# has to be increased when the calculation of registered features changes without a change of their registration,
+# e.g. in SyntaxArrays, TextMemo or the functions of custom features, so that stored feature values are calculated again (see feature_store.py)
+FEATURE_VERSION = 1
+
 ### FUNCTIONS ###
 # defined outside of the class because they are not directly related to syntactic complexity and do not need to be imported
 # the class for the syntactic complexity measures is defined below these functions
 
-def make_final_list(mean_mes: list):
+def make_long_df(feat_lists: dict):
     """
-    Function that takes a list in which syntactic complexity measure results are collected for each individual text, and stores the results in a final list where they are assigned to years and their yearly average is calculated.
+    Function that takes the feature results of the texts and stores them in long format, one row per feature and text with the value in a numeric column.
 
     Input:
-        1. mean_mes (list): List containing lists of the form [year (int), text number (int), text value (float)]
+        1. feat_lists (dict): Dictionary with key = feature name (str) and value = list of lists [year, text number, text value] for each text
     Output:
-        1. final_list (list): List containing lists of the form [year (int), year value (float), student values (list of float)"""
+        1. df_long (Pandas.DataFrame): Data frame with the columns FEATURE (str), YEAR (int), DOC (int, text number), VALUE (float)"""
 
-    final_list = list()
+    df_long = pd.DataFrame([[feat_name] + list(row) for feat_name, rows in feat_lists.items() for row in rows], columns=["FEATURE", "YEAR", "DOC", "VALUE"])
+    df_long = df_long.astype({"YEAR": "int64", "DOC": "int64", "VALUE": "float64"})
 
-    # load list into data frame with columns for year, text number, text value
-    df_data = pd.DataFrame(mean_mes, columns=["YEAR", "NO", "VALUE"])
+    return df_long
 
-    for year in set(df_data.YEAR):
-        # save all text (student) values from the year in a list
-        student_vals = list(df_data[df_data["YEAR"] == year].VALUE)
-        # save the mean of the student values as year value
-        year_val = np.mean(np.array(student_vals))
-        # add values to final list
-        final_list.append([year, year_val, student_vals])
-    
-    return final_list
+def aggregate_years(df_long: pd.DataFrame):
+    """
+    Function that calculates the yearly statistics of all features at once with grouped aggregations: mean and standard deviation (sample) of the text values
+    per feature and year, and mean and standard deviation (sample) of the year values per feature.
 
-def make_final_df(final_list: list):
+    Input:
+        1. df_long (Pandas.DataFrame): Data frame with the columns FEATURE, YEAR, DOC, VALUE (see make_long_df)
+    Output:
+        1. df_years (Pandas.DataFrame): Data frame with the columns FEATURE, YEAR, YEAR_VAL, STUDENT_STD, YEARS_MEAN, YEARS_STD, sorted by feature and year"""
+
+    df_years = df_long.groupby(["FEATURE", "YEAR"], sort=True).VALUE.agg(YEAR_VAL="mean", STUDENT_STD="std").reset_index()
+
+    # statistics over the years of every feature
+    df_all = df_years.groupby("FEATURE", sort=False).YEAR_VAL.agg(YEARS_MEAN="mean", YEARS_STD="std")
+    df_years = df_years.join(df_all, on="FEATURE")
+
+    return df_years
+
+def make_result_dfs(df_long: pd.DataFrame, df_years: pd.DataFrame):
     """
-    Function that creates a dataframe from list of the form [year, year value, student values] and sorts by years.
+    Function that splits the yearly statistics into one result data frame per feature (the format of the class attributes of SynComplMeas and the result files),
+    with the text values of every year in the column STUDENT_VALS.
 
     Input:
-        1. final_list (list): List containing lists of the form [year (int), year value (float), student values (list of float)]
+        1. df_long (Pandas.DataFrame): Data frame with the columns FEATURE, YEAR, DOC, VALUE (see make_long_df)
+        2. df_years (Pandas.DataFrame): Yearly statistics (see aggregate_years)
     Output:
-        1. final_df (Pandas.DataFrame): Dataframe with the columns [year (int), year value (float), student values (list of float)], sorted by years"""
-    
-    # load final list into data frame
-    final_df = pd.DataFrame(final_list, columns=["YEAR", "YEAR_VAL", "STUDENT_VALS"])
-    
-    # sort data frame by year, starting with the lowest number
-    final_df = final_df.sort_values(by="YEAR", ignore_index=True)
+        1. results_dict (dict): Dictionary with key = feature name (str) and value = data frame with the columns
+                                YEAR, YEAR_VAL, STUDENT_VALS, STUDENT_STD, YEARS_MEAN, YEARS_STD, sorted by years"""
+
+    # text values of every feature and year in the order of the texts
+    student_vals = df_long.groupby(["FEATURE", "YEAR"], sort=True).VALUE.agg(list).rename("STUDENT_VALS")
+    df_years = df_years.join(student_vals, on=["FEATURE", "YEAR"])
+
+    results_dict = dict()
+    for feat_name, final_df in df_years.groupby("FEATURE", sort=False):
+        results_dict[feat_name] = final_df[["YEAR", "YEAR_VAL", "STUDENT_VALS", "STUDENT_STD", "YEARS_MEAN", "YEARS_STD"]].reset_index(drop=True)
+
+    return results_dict
+
+
+### TEXT MEMO ###
+
+class TextMemo:
+    """
+    A class to represent the derived columns of one text (encoded node tags, embedding depths, node counts, ...).
+    Every derived column is calculated when it is used for the first time and then kept, so each derivation happens once per text,
+    even if several features need it. The memo is released with release() when all features of the text have been calculated.
+
+    Attributes
+    ----------
+    df : Pandas.DataFrame
+        Data frame with corpus annotations for a text
+    tok_count : int
+        Number of tokens
+    sent_count : int
+        Number of sentences (value of column SENT_ID in the last row plus 1)
+    syn : SyntaxArrays
+        Encoded node tags of the syntax column (see SyntaxArrays)
+    depths : numpy.ndarray
+        Embedding depth of each token, without topological field node tags
+    sent_depths : numpy.ndarray
+        Maximum embedding depth of each sentence
+    xpos_counts : dict
+        Dictionary with key = XPOS tag (str) and value = frequency (int)
+    node_counts : dict
+        Dictionary with key = pattern name of the feature registry (str) and value = tuple (number of nodes, number of node tags)
+
+    Methods
+    -------
+    count_nodes(regex: str, prefix_RE: str, skip_adjacent: bool):
+        Counts node tags matching a regular expression (memoized).
+    count_xpos(regex: str):
+        Counts a pattern in the XPOS column (memoized).
+    release():
+        Deletes the data frame and all derived columns.
+    """
+    def __init__(self, df: pd.DataFrame, registry=None):
+        self.df = df
+        self.registry = FEATURES if registry is None else registry
+        self._counts = dict()
+
+    @cached_property
+    def tok_count(self):
+        return len(self.df)
+
+    @cached_property
+    def sent_count(self):
+        return int(self.df.SENT_ID.iloc[-1])+1
+
+    @cached_property
+    def syn(self):
+        return SyntaxArrays.from_column(self.df.SYNTAX)
+
+    @cached_property
+    def depths(self):
+        return self.syn.get_depths(skip_labels=TOP_FIELDS)
+
+    @cached_property
+    def sent_depths(self):
+        return SynComplMeas.get_sent_depths(self.depths, self.df.SENT_ID)
+
+    @cached_property
+    def xpos_counts(self):
+        return self.df.XPOS.value_counts(sort=False).to_dict()
+
+    @cached_property
+    def node_counts(self):
+        return self.registry.count_patterns(self.syn)
+
+    def count_nodes(self, regex: str, prefix_RE=r"B-", skip_adjacent=False):
+        """
+        Counts node tags matching a regular expression for a node label. A node tag matches if its label starts with a match of the regular expression,
+        optionally preceded by a prefix, which is the same as counting r"(^|\|)(B-)?" + regex in the syntax column. Counts are calculated once per text.
+
+        Input:
+            1. regex (str): Regular expression for a node label
+            2. prefix_RE (str): Regular expression for the optional prefix of the node tag. The default value is "B-" so that each node is counted once,
+                                use "[BIE]-" to count all node tags that belong to the node
+            3. skip_adjacent (bool): True when only every second one of adjacent matching node tags of a token is counted (see SyntaxArrays.count_node_runs),
+                                     e.g. the same as counting r"(^|\|)(B-)?C($|\|)" for regex "C$". The default value is False
+        Output:
+            1. node_count (numpy.int64): Number of matching node tags"""
 
-    # add columns for standard deviation (sample) and mean
-    final_df["STUDENT_STD"] = final_df.STUDENT_VALS.apply(np.std, ddof=1)
-    final_df["YEARS_MEAN"] = final_df.YEAR_VAL.mean()
-    final_df["YEARS_STD"] = final_df.YEAR_VAL.std()
+        key = ("syn", regex, prefix_RE, skip_adjacent)
+        if key not in self._counts:
+            # BIO flags of the node tags that are counted: no prefix and all prefixes that match prefix_RE
+            flags = (NO_PREFIX,) + tuple(flag for prefix, flag in PREFIXES.items() if re.fullmatch(prefix_RE, prefix))
+            if skip_adjacent:
+                self._counts[key] = self.syn.count_node_runs(regex, flags)
+            else:
+                self._counts[key] = self.syn.count_nodes(regex, flags)
 
-    # safe data frame with different order of the columns
-    final_df = final_df[["YEAR", "YEAR_VAL", "STUDENT_VALS", "STUDENT_STD", "YEARS_MEAN", "YEARS_STD"]]
+        return self._counts[key]
 
-    return final_df
+    def count_xpos(self, regex: str):
+        """
+        Counts a pattern in the XPOS column. Each distinct XPOS tag is only matched once.
+
+        Input:
+            1. regex (str): Regular expression for a pattern
+        Output:
+            1. pattern_count (int): Number of how often the pattern occured"""
+
+        key = ("xpos", regex)
+        if key not in self._counts:
+            pattern_RE = get_compiled(regex)
+            self._counts[key] = sum(freq*len(pattern_RE.findall(tag)) for tag, freq in self.xpos_counts.items())
+
+        return self._counts[key]
+
+    def release(self):
+        """
+        Deletes the data frame and all derived columns, so that their memory can be freed."""
+
+        registry = self.registry
+        self.__dict__.clear()
+        self.df = None
+        self.registry = registry
+        self._counts = dict()
+
+
+# compiled regular expressions (e.g. the XPOS patterns are compiled only once)
+COMPILED_RES = dict()
+
+def get_compiled(regex: str):
+    """
+    Function that returns the compiled regular expression and compiles it only the first time.
+
+    Input:
+        1. regex (str): Regular expression
+    Output:
+        1. pattern (re.Pattern): Compiled regular expression"""
+
+    pattern = COMPILED_RES.get(regex)
+    if pattern is None:
+        pattern = COMPILED_RES[regex] = re.compile(regex)
+
+    return pattern
+
+
+### FEATURE REGISTRY ###
+
+class FeatureRegistry:
+    """
+    A class to represent the declarative registry of the syntactic complexity features.
+    Node label patterns are registered by name, and features are defined by their kind and the patterns they use:
+    "count" (nodes per text), "ratio" (nodes per sentence or per nodes of another pattern), "length" (node tags per node) and
+    "custom" (function of the derived columns of a text, see TextMemo). All patterns are compiled into one lookup table from node label ids to patterns,
+    so the node tags of a text are counted for all patterns at once, no matter how many features are registered.
+    Features that are registered after the worker processes have been started are not known in the workers.
+
+    Attributes
+    ----------
+    patterns : dict
+        Dictionary with key = pattern name (str) and value = regular expression for a node label (str)
+    features : dict
+        Dictionary with key = feature name (str) and value = tuple (kind, arguments)
+    names : list
+        Feature names in the order of registration
+    skip_adjacent : set
+        Names of the patterns whose adjacent node tags in one token are counted like the former regex counts (see add_pattern)
+
+    Methods
+    -------
+    add_pattern(name: str, regex: str, skip_adjacent: bool):
+        Registers a node label pattern.
+    add_count(feat_name: str, pattern: str):
+        Registers a feature "number of nodes per text".
+    add_ratio(feat_name: str, pattern: str, per: str):
+        Registers a feature "nodes per sentence" (per="SENT") or "nodes per nodes of another pattern".
+    add_length(feat_name: str, pattern: str):
+        Registers a feature "mean length of nodes in node tags".
+    add_custom(feat_name: str, func: function, nodes: bool):
+        Registers a feature that is calculated by a function of the derived columns of a text.
+    get_label_table(vocab: LabelVocab):
+        Returns the lookup table from node label ids to patterns.
+    count_patterns(syn: SyntaxArrays):
+        Counts the nodes and node tags of all patterns in a text.
+    calc_feature(feat_name: str, memo: TextMemo):
+        Calculates one feature for a text.
+    needs_nodes(features: list):
+        Checks whether any of the features needs the node tags of the syntax column.
+    get_fingerprint(feat_name: str):
+        Returns a hash of the definition of a feature.
+    """
+    def __init__(self):
+        self.patterns = dict()
+        self.features = dict()
+        self.names = list()
+        self.skip_adjacent = set()
+        self._tables = dict()
+
+    def add_pattern(self, name: str, regex: str, skip_adjacent=False):
+        """
+        Registers a node label pattern. A node tag matches if its label starts with a match of the regular expression (see SyntaxArrays.count_nodes).
+
+        Input:
+            1. name (str): Name of the pattern, e.g. "relc"
+            2. regex (str): Regular expression for a node label, e.g. "R-?SIMPX" for relative clauses
+            3. skip_adjacent (bool): True when only every second one of adjacent matching node tags of a token is counted as node
+                                     (see SyntaxArrays.count_node_runs), like a regex count that consumes the following "|". The default value is False"""
+
+        self.patterns[name] = regex
+        if skip_adjacent:
+            self.skip_adjacent.add(name)
+        else:
+            self.skip_adjacent.discard(name)
+        # tables have to be built again with the new pattern
+        self._tables = dict()
+
+    def add_feature(self, feat_name: str, kind: str, *args):
+        """
+        Registers a feature (used by add_count, add_ratio, add_length and add_custom).
+
+        Input:
+            1. feat_name (str): Name of the feature
+            2. kind (str): "count", "ratio", "length" or "custom"
+            3. args: Arguments of the kind (pattern names or function)"""
+
+        for arg in args:
+            if isinstance(arg, str) and arg != "SENT" and arg not in self.patterns:
+                raise ValueError("unknown pattern: %s" % arg)
+
+        if feat_name not in self.features:
+            self.names.append(feat_name)
+        self.features[feat_name] = (kind,) + args
+
+    def add_count(self, feat_name: str, pattern: str):
+        self.add_feature(feat_name, "count", pattern)
+
+    def add_ratio(self, feat_name: str, pattern: str, per="SENT"):
+        self.add_feature(feat_name, "ratio", pattern, per)
+
+    def add_length(self, feat_name: str, pattern: str):
+        self.add_feature(feat_name, "length", pattern)
+
+    def add_custom(self, feat_name: str, func, nodes=True):
+        self.add_feature(feat_name, "custom", func, nodes)
+
+    def get_label_table(self, vocab):
+        """
+        Returns the lookup table from node label ids to patterns (built once and only built again when the vocabulary has grown).
+
+        Input:
+            1. vocab (LabelVocab): Vocabulary of the node labels
+        Output:
+            1. table (numpy.ndarray): Array of the shape (number of labels, number of patterns), 1 if the label matches the pattern, otherwise 0"""
+
+        table = self._tables.get(id(vocab))
+
+        if table is None or table.shape[0] < len(vocab.labels):
+            masks = [vocab.get_label_mask(regex) for regex in self.patterns.values()]
+            table = np.stack(masks, axis=1).astype(np.int64) if masks else np.zeros((len(vocab.labels), 0), dtype=np.int64)
+            self._tables[id(vocab)] = table
+
+        return table
+
+    def count_patterns(self, syn: SyntaxArrays):
+        """
+        Counts the nodes (node tags without prefix or with "B-") and all node tags of every pattern in a text with one product of the tag counts
+        of the text and the lookup table.
+
+        Input:
+            1. syn (SyntaxArrays): Encoded node tags of the text
+        Output:
+            1. node_counts (dict): Dictionary with key = pattern name (str) and value = tuple (number of nodes, number of node tags)"""
+
+        tag_counts = syn.get_tag_counts()
+        table = self.get_label_table(syn.vocab)
+        tag_counts = tag_counts[:table.shape[0]]
+
+        # nodes and node tags per pattern
+        nodes = table.T @ (tag_counts[:, NO_PREFIX] + tag_counts[:, B])
+        tags = table.T @ tag_counts.sum(axis=1)
+
+        node_counts = {name: (nodes[i], tags[i]) for i, name in enumerate(self.patterns)}
+
+        # patterns whose adjacent node tags are not all counted
+        for name in self.skip_adjacent:
+            node_counts[name] = (syn.count_node_runs(self.patterns[name]), node_counts[name][1])
+
+        return node_counts
+
+    def calc_feature(self, feat_name: str, memo):
+        """
+        Calculates one feature for a text from its derived columns (counts are calculated when they are needed for the first time).
+
+        Input:
+            1. feat_name (str): Name of the feature
+            2. memo (TextMemo): Derived columns of the text
+        Output:
+            1. feat_val (float): Feature value for the text"""
+
+        if feat_name not in self.features:
+            raise ValueError("unknown feature: %s" % feat_name)
+
+        kind, *args = self.features[feat_name]
+
+        if kind == "custom":
+            feat_val = args[0](memo)
+        elif kind == "count":
+            feat_val = memo.node_counts[args[0]][0]
+        elif kind == "ratio":
+            pattern, per = args
+            feat_val = memo.node_counts[pattern][0]/(memo.sent_count if per == "SENT" else memo.node_counts[per][0])
+        else:
+            # number of node tags in phrase/field divided by number of node tags that mark the beginning of a phrase/field (see SynComplMeas.get_phrase_lens)
+            nodes, tags = memo.node_counts[args[0]]
+            feat_val = tags/nodes
+
+        return feat_val
+
+    def needs_nodes(self, features: list):
+        """
+        Checks whether any of the features needs the node tags of the syntax column.
+
+        Input:
+            1. features (list): Names of the features
+        Output:
+            1. needs (bool): True if the node tags have to be split"""
+
+        return any(self.features[feat_name][0] != "custom" or self.features[feat_name][2] for feat_name in features)
+
+    def get_fingerprint(self, feat_name: str):
+        """
+        Returns a hash of the definition of a feature: FEATURE_VERSION, kind, regular expressions of the patterns (and whether adjacent node tags are skipped)
+        and names of the functions of custom features. Stored feature values with another fingerprint are outdated (see feature_store.py).
+
+        Input:
+            1. feat_name (str): Name of the feature
+        Output:
+            1. fingerprint (str): Hash of the definition"""
+
+        kind, *args = self.features[feat_name]
+
+        parts = [str(FEATURE_VERSION), kind]
+        for arg in args:
+            if callable(arg):
+                parts.append(arg.__module__ + "." + arg.__qualname__)
+            elif isinstance(arg, str) and arg in self.patterns:
+                parts.append("%s=%s%s" % (arg, self.patterns[arg], " skip_adjacent" if arg in self.skip_adjacent else ""))
+            else:
+                parts.append(repr(arg))
+
+        return hashlib.sha1("\t".join(parts).encode("UTF-8")).hexdigest()
+
+
+## features that are not calculated from node counts
+
+def get_sent_lens(memo: TextMemo):
+    # 1: Mean Sentence Length in Tokens
+    return memo.tok_count/memo.sent_count
+
+def get_mean_depth(memo: TextMemo):
+    # 2: Mean Token Embedding Depth (mean of the token embedding depths)
+    return memo.depths.mean()
+
+def get_mean_max_depth(memo: TextMemo):
+    # 3: Mean Maximum Embedding Depth per Sentence (maximum embedding depth of each sentence, mean over all sentences)
+    return np.mean(memo.sent_depths)
+
+def get_vv_nn(memo: TextMemo):
+    # 7: NN/VV.* ratio
+    return memo.count_xpos(r"VV.*")/memo.count_xpos(r"NN")
+
+
+# registry of the syntactic complexity features (in the order of the result files)
+FEATURES = FeatureRegistry()
+
+# node label patterns
+# subc is counted like the regex r"(^|\|)(B-)?C($|\|)" of the result files: of adjacent C node tags of a token (e.g. "B-C|C") only every second one is counted
+# (see check_adjacent_c_nodes in src/checks.py)
+for name, regex in [("simpx", r"SIMPX"), ("subc", r"C$"), ("relc", r"R-?SIMPX"), ("parac", r"P-?SIMPX"), ("clauses", r"[PR]?-?SIMPX"),
+                    ("verbx", r"VXF?INF?"), ("vc", r"VCE?"), ("nx", r"NX"), ("px", r"PX"), ("vf", r"VF"), ("mf", r"MF"), ("nf", r"NF")]:
+    FEATURES.add_pattern(name, regex, skip_adjacent=(name == "subc"))
+
+FEATURES.add_custom("sent_lens", get_sent_lens, nodes=False)
+FEATURES.add_custom("tok_embeds", get_mean_depth)
+FEATURES.add_custom("max_sent_embeds", get_mean_max_depth)
+# 4: Clause-sentence or phrase-sentence ratios
+for name in ["simpx", "subc", "relc", "parac", "clauses", "verbx", "vc", "nx"]:
+    FEATURES.add_ratio(name + "_s", name)
+# 5: clause-clause ratios
+for name in ["simpx", "subc", "relc", "parac"]:
+    FEATURES.add_ratio(name + "_c", name, per="clauses")
+# 6: lengths of clauses/phrases
+for feat_name, name in [("clause_lens", "clauses"), ("simpx_lens", "simpx"), ("relc_lens", "relc"), ("nx_lens", "nx"), ("px_lens", "px"),
+                        ("vf_lens", "vf"), ("mf_lens", "mf"), ("nf_lens", "nf")]:
+    FEATURES.add_length(feat_name, name)
+FEATURES.add_custom("vv_nn", get_vv_nn, nodes=False)
 
 
 ### CLASS ###
@@ -70,6 +483,12 @@ class SynComplMeas:
         Name for the class
     df_dict : dict
         Dictionary that contains data frames with corpus annotation data for several connlup files
+    values : Pandas.DataFrame
+        Text values of all calculated features in long format with the columns FEATURE, YEAR, DOC, VALUE
+    workers : int
+        Number of worker processes for features that are calculated later (lazy mode)
+    profiler : profiling.Profiler
+        Records the timings of features that are calculated later (lazy mode)
     sent_lens : Pandas.DataFrame
         Results for feature "Mean Sentence Length in Tokens"
     tok_embeds : Pandas.DataFrame
@@ -121,18 +540,31 @@ class SynComplMeas:
 
     Methods
     -------
-    count_pattern(df: Pandas.DataFrame, regex: str):
-        Counts pattern in the syntax column of a text.
-    get_tok_embeds(df: Pandas.DataFrame, replace_RE: str):
+    get_features(features: list, workers: int, profiler: Profiler):
+        Calculates the requested features that have not been calculated yet and returns their results.
+    iter_text_features(df_items: iterable, workers: int, profiler: Profiler, features: list):
+        Calculates the features of the texts one after another or in a pool of worker processes.
+    calc_text_features(df: Pandas.DataFrame, profiler: Profiler, doc: tuple, features: list):
+        Calculates the syntactic complexity features (all or only the requested ones) for one text.
+    profile_text_features(df: Pandas.DataFrame, doc: tuple, features: list):
+        Calculates the syntactic complexity features for one text and returns the timings of the steps.
+    count_nodes(df: Pandas.DataFrame, regex: str, prefix_RE: str, skip_adjacent: bool):
+        Counts node tags matching a regular expression for a node label in the syntax column of a text.
+    count_xpos(df: Pandas.DataFrame, regex: str):
+        Counts pattern in the XPOS column of a text.
+    get_tok_embeds(df: Pandas.DataFrame):
         Calculates feature "Mean Token Embedding Depth" for a text.
-    get_max_embeds(df: Pandas.DataFrame, replace_RE: str, sent_count: int):
+    get_max_embeds(df: Pandas.DataFrame):
         Calculates feature "Mean Maximum Embedding Depth per Sentence" for a text.
-    get_clause_lens(df: Pandas.DataFrame, regex: str):
-        Takes regular expression of a clause's node label and calculates the mean clause length in a text.
+    get_sent_depths(depths: numpy.ndarray, sent_ids: numpy.ndarray):
+        Calculates the maximum embedding depth of each sentence of a text.
     get_phrase_lens(df: Pandas.DataFrame, regex: str):
         Takes regular expression of a phrase's node label and calculates the mean phrase length in a text.
     """
-    def __init__(self, name, df_dict):
+    # syntactic complexity feature names (registered in FEATURES, new features are added there)
+    feature_names = FEATURES.names
+
+    def __init__(self, name, df_dict, workers=1, profiler=None, features=None, lazy=False):
         """
         Constructs all the necessary attributes for the syntactic complexity measures object.
 
@@ -140,293 +572,339 @@ class SynComplMeas:
         ----------
             name : str
                 Name for the class
-            df_dict : dict
-                Dictionary that contains data frames with corpus annotation data for several connlup files
+            df_dict : dict or iterator
+                Dictionary that contains data frames with corpus annotation data for several connlup files,
+                or iterator of tuples (key, data frame), e.g. functions.iter_dfs, for corpora that do not fit into memory (streaming mode)
+            workers : int
+                Number of worker processes for calculating the features of the texts. The default value is 1 (no worker processes)
+            profiler : profiling.Profiler
+                Records wall time and tokens of every feature and text (also in worker processes). The default value is None (no timing)
+            features : list
+                Names of the features that are calculated (see feature_names). The default value is None (all features)
+            lazy : bool
+                True when no feature is calculated now; features are calculated when they are used for the first time (e.g. sc.vv_nn)
+                or with get_features. Only possible if df_dict is a dictionary. The default value is False
         """
         self.name = name
-        self.df_dict = df_dict
-
-        # syntactic complexity feature names
-        self.feature_names = ["sent_lens", "tok_embeds", "max_sent_embeds", "simpx_s", "subc_s", "relc_s", "parac_s", "clauses_s", "verbx_s", "vc_s", "nx_s", "simpx_c",
-        "subc_c", "relc_c", "parac_c", "clause_lens", "simpx_lens", "relc_lens", "nx_lens", "px_lens", "vf_lens", "mf_lens", "nf_lens", "vv_nn"]
+        self.workers = workers
+        self.profiler = profiler
+
+        if isinstance(df_dict, dict):
+            self.df_dict = df_dict
+            df_items = df_dict.items()
+        elif lazy:
+            raise ValueError("lazy mode needs a dictionary of data frames, not an iterator")
+        else:
+            # streaming mode: data frames are not kept after their features have been calculated, only the feature results
+            self.df_dict = dict()
+            df_items = df_dict
 
         ### calculate features ###
 
-        # regular expression that matches all topological field node tags (needed later for some features)
-        top_fields_RE = r"""(?x)    # flag verbose
-                        \|          # beginning hyphen
-                        (
-                        ([BIE]-)?   # optional: B- or I- or E-
-                         (
-                         [VMN]FE?   # VF or MF or NF or MFE
-                         |
-                         L[KV]      # LK or LV
-                         |
-                         F?KOORD    # FKOORD or KOORD
-                         |
-                         PARORD
-                         |
-                         V?CE?      # VC or VCE or C
-                         |
-                         FKONJ
-                         )
-                        )
-                        (?= $|\|)   # lookahead: should be there but won't be replaced
-                        """
+        if not lazy:
+            self.set_results(self.calc_feat_lists(df_items, features, workers, profiler))
+
+    def __getattr__(self, attr):
+        # only called for attributes that do not exist yet: features that have not been calculated are calculated on first use
+        if attr in SynComplMeas.feature_names and self.__dict__.get("df_dict"):
+            return self.get_features([attr])[attr]
+        raise AttributeError("%r object has no attribute %r" % (type(self).__name__, attr))
+
+    def calc_feat_lists(self, df_items, features=None, workers=1, profiler=None):
+        """
+        Calculates features for all texts and collects the results per feature.
+
+        Input:
+            1. df_items (iterable): Tuples (key, data frame), e.g. df_dict.items()
+            2. features (list): Names of the features. The default value is None (all features)
+            3. workers (int): Number of worker processes. The default value is 1 (no worker processes)
+            4. profiler (profiling.Profiler): Records the timings of the features of every text. The default value is None (no timing)
+        Output:
+            1. feat_lists (dict): Dictionary with key = feature name (str) and value = list of lists [year, text number, text value] for each text"""
+
+        features = self.feature_names if features is None else [feat_name for feat_name in self.feature_names if feat_name in features]
 
         # initialize empty dictionary for saving the results of the different features later
         # key = variable for the feature (str); value = list of lists [year, text number, text value] for each text
         feat_lists = dict()
 
-        for feat_name in self.feature_names:
+        for feat_name in features:
             # initialize empty list for each feature
             feat_lists[feat_name] = list()
-        
-        # iterate over dictionary containing data frames with corpus annotations for every text
-        for year, no in self.df_dict:
-
-            ### save variables
-            
-            df = self.df_dict[(year, no)]
-            tok_count = len(df)
-
-            # sent count = value of column SENT_ID in the last row plus 1 (as sent id starts with 0)
-            sent_count = int(df[-1:].SENT_ID)+1
-
-            # count all patterns that will be needed and save them
-            simpx_count = self.count_pattern(df, r"(^|\|)(B-)?SIMPX")
-            subc_count = self.count_pattern(df, r"(^|\|)(B-)?C($|\|)")
-            relc_count = self.count_pattern(df, r"(^|\|)(B-)?R-?SIMPX")
-            parac_count = self.count_pattern(df, r"(^|\|)(B-)?P-?SIMPX")
-            clauses_count = self.count_pattern(df, r"(^|\|)(B-)?[PR]?-?SIMPX")
-            verbx_count = self.count_pattern(df, r"(^|\|)(B-)?VXF?INF?")
-            vc_count = self.count_pattern(df, r"(^|\|)(B-)?VCE?")
-            nx_count = self.count_pattern(df, r"(^|\|)(B-)?NX")
-            vv_count = self.count_pattern(df, r"VV.*", col="xpos")
-            nn_count = self.count_pattern(df, r"NN", col="xpos")
-
-
-            ### calculate syntactic complexity features
-
-            ## 1: Mean Sentence Length in Tokens
-            sent_lens = tok_count/sent_count
-            # append result list to dictionary for saving results
-            feat_lists["sent_lens"].append([year, no, sent_lens])
-
-            ## 2: Mean Token Embedding Depth
-            # perform method
-            tok_embeds = self.get_tok_embeds(df, top_fields_RE)
-            # append result list to dictionary for saving results
-            feat_lists["tok_embeds"].append([year, no, tok_embeds])
-
-            ## 3: Mean Maximum Embedding Depth per Sentence
-            # perform method
-            max_embeds = self.get_max_embeds(df, top_fields_RE, sent_count)
-            # append result list to dictionary for saving results
-            feat_lists["max_sent_embeds"].append([year, no, max_embeds])
-
-            ## 4: Clause-sentence or phrase-sentence ratios
-            # save counts of clauses/phrases in list
-            total_counts = [simpx_count, subc_count, relc_count, parac_count, clauses_count, verbx_count, vc_count, nx_count]
-            # also save variable names as strings in list (needed for defining dictionary keys later)
-            total_counts_names = ["simpx_count", "subc_count", "relc_count", "parac_count", "clauses_count", "verbx_count", "vc_count", "nx_count"]
-
-            # iterate over counts and variable names
-            for count, count_name in zip(total_counts, total_counts_names):
-                count_sent_ratio = count/sent_count
-                # define first part of the key string
-                key1 = count_name.split("_")[0]
-                # append result list to dictionary for saving results
-                feat_lists[key1 + "_s"].append([year, no, count_sent_ratio])
-
-            ## 5: clause-clause or phrase-clause ratios
-            # remove "clauses_count" from the total counts and total counts names lists as it is only needed for normalizing from now on
-            # also remove "verbx_count", "vc_count", "nx_count" as we do not examine their per clause ratio
-            for i in range(4):
-                total_counts.pop(4)
-                total_counts_names.pop(4)
-
-            # iterate over counts and variable names
-            for count, count_name in zip(total_counts, total_counts_names):
-                count_clause_ratio = count/clauses_count
-                # define first part of the key string
-                key1 = count_name.split("_")[0]
-                # append result list to dictionary for saving results
-                feat_lists[key1 + "_c"].append([year, no, count_clause_ratio])
-
-            ## 6: lengths of clauses/phrases
-            # perform method for getting clause lengths and save values
-            # mean_clause_lens = self.get_clause_lens(df, r"[PR]?-?SIMPX")
-            # mean_simpx_lens = self.get_clause_lens(df, r"SIMPX")
-            # mean_relc_lens = self.get_clause_lens(df, r"R-?SIMPX")
-            mean_clause_lens = self.get_phrase_lens(df, r"[PR]?-?SIMPX")
-            mean_simpx_lens = self.get_phrase_lens(df, r"SIMPX")
-            mean_relc_lens = self.get_phrase_lens(df, r"R-?SIMPX")
-
-            # perform method for getting phrase lengths and save values
-            mean_nx_lens = self.get_phrase_lens(df, r"NX")
-            mean_px_lens = self.get_phrase_lens(df, r"PX")
-            mean_vf_lens = self.get_phrase_lens(df, r"VF")
-            mean_mf_lens = self.get_phrase_lens(df, r"MF")
-            mean_nf_lens = self.get_phrase_lens(df, r"NF")
-
-            # save values + variable names as strings in lists
-            len_vals = [mean_clause_lens, mean_simpx_lens, mean_relc_lens, mean_nx_lens, mean_px_lens, mean_vf_lens, mean_mf_lens, mean_nf_lens]
-            len_vals_names = ["mean_clause_lens", "mean_simpx_lens", "mean_relc_lens", "mean_nx_lens", "mean_px_lens", "mean_vf_lens", "mean_mf_lens", "mean_nf_lens"]
-
-            # iterate over values and value variable names
-            for len_val, len_val_name in zip(len_vals, len_vals_names):
-                # define first part of key string
-                key1 = len_val_name.split("_")[1]
+
+        # iterate over keys (year, text number) and feature results of every text
+        for (year, no), text_feats in self.iter_text_features(df_items, workers, profiler, features):
+            for feat_name in features:
                 # append result list to dictionary for saving results
-                feat_lists[key1 + "_lens"].append([year, no, len_val])
+                feat_lists[feat_name].append([year, no, text_feats[feat_name]])
 
-            ## 7: NN/VV.* ratio
-            vv_nn = vv_count/nn_count
-            feat_lists["vv_nn"].append([year, no, vv_nn])
-            
-            #### end of over data frames iterating for-loop
-        
-        ### RESULTS ###
+        return feat_lists
 
-        # initialize dictionary that saves results as data frames
-        results_dict = dict()
+    def get_features(self, features: list, workers=None, profiler=None):
+        """
+        Calculates the requested features that have not been calculated yet (only the counts they need) and saves them as class attributes.
 
-        # iterate over dictionary that has results saved in lists
-        for key_name in feat_lists:
-            # perform function that assigns results to the respective years, calculates year value, and saves it in final list
-            final_list = make_final_list(feat_lists[key_name])
-            # perform function that makes a data frame out of it and adds standard deviations etc.
-            results_dict[key_name] = make_final_df(final_list)
-
-        # get results from resutls dict and save them as class atributes
-        self.sent_lens = results_dict["sent_lens"]
-        self.tok_embeds = results_dict["tok_embeds"]
-        self.max_sent_embeds = results_dict["max_sent_embeds"]
-        self.simpx_s = results_dict["simpx_s"]
-        self.subc_s = results_dict["subc_s"]
-        self.relc_s = results_dict["relc_s"]
-        self.parac_s = results_dict["parac_s"]
-        self.clauses_s = results_dict["clauses_s"]
-        self.verbx_s = results_dict["verbx_s"]
-        self.vc_s = results_dict["vc_s"]
-        self.nx_s = results_dict["nx_s"]
-        self.simpx_c = results_dict["simpx_c"]
-        self.subc_c = results_dict["subc_c"]
-        self.relc_c = results_dict["relc_c"]
-        self.parac_c = results_dict["parac_c"]
-        self.clause_lens = results_dict["clause_lens"]
-        self.simpx_lens = results_dict["simpx_lens"]
-        self.relc_lens = results_dict["relc_lens"]
-        self.nx_lens = results_dict["nx_lens"]
-        self.px_lens = results_dict["px_lens"]
-        self.vf_lens = results_dict["vf_lens"]
-        self.mf_lens = results_dict["mf_lens"]
-        self.nf_lens = results_dict["nf_lens"]
-        self.vv_nn = results_dict["vv_nn"]
+        Input:
+            1. features (list): Names of the features, e.g. ["sent_lens", "vv_nn"]
+            2. workers (int): Number of worker processes. The default value is None (value given to the constructor)
+            3. profiler (profiling.Profiler): Records the timings. The default value is None (profiler given to the constructor)
+        Output:
+            1. results (dict): Dictionary with key = feature name (str) and value = result data frame"""
+
+        unknown = set(features).difference(self.feature_names)
+        if unknown:
+            raise ValueError("unknown features: %s" % ", ".join(sorted(unknown)))
+
+        missing = [feat_name for feat_name in features if feat_name not in self.__dict__]
+        if missing:
+            workers = self.__dict__.get("workers", 1) if workers is None else workers
+            profiler = self.__dict__.get("profiler") if profiler is None else profiler
+            self.set_results(self.calc_feat_lists(self.df_dict.items(), missing, workers, profiler))
+
+        results = {feat_name: self.__dict__[feat_name] for feat_name in features}
+
+        return results
     
+    @classmethod
+    def from_feat_lists(cls, name, feat_lists):
+        """
+        Constructs a syntactic complexity measures object from feature results that have already been calculated for each text (e.g. stored results, see feature_store.py).
+
+        Parameters
+        ----------
+            name : str
+                Name for the class
+            feat_lists : dict
+                Dictionary with key = feature name (str) and value = list of lists [year, text number, text value] for each text
+        """
+        sc = cls.__new__(cls)
+        sc.name = name
+        sc.df_dict = dict()
+        sc.set_results(feat_lists)
+
+        return sc
 
     ### METHODS ####
 
-    def count_pattern(self, df: pd.DataFrame, regex: str, col="syn"):
+    def set_results(self, feat_lists: dict):
+        """
+        Assigns the feature results of the texts to the respective years and saves the result data frames as class attributes.
+        The text values of all features are kept in long format in the attribute values, and the yearly statistics of all features are calculated at once.
+
+        Input:
+            1. feat_lists (dict): Dictionary with key = feature name (str) and value = list of lists [year, text number, text value] for each text"""
+
+        df_long = make_long_df(feat_lists)
+
+        # keep the values of features that have been calculated before (lazy mode)
+        values = self.__dict__.get("values")
+        if values is not None:
+            df_long = pd.concat([values[~values.FEATURE.isin(feat_lists)], df_long], ignore_index=True)
+        self.values = df_long
+
+        # assign results to years, calculate year values and standard deviations etc. for all features at once
+        new_values = df_long[df_long.FEATURE.isin(feat_lists)]
+        results_dict = make_result_dfs(new_values, aggregate_years(new_values))
+
+        # get results from resutls dict and save them as class atributes (sent_lens, tok_embeds, ..., vv_nn)
+        for key_name in feat_lists:
+            empty_df = pd.DataFrame(columns=["YEAR", "YEAR_VAL", "STUDENT_VALS", "STUDENT_STD", "YEARS_MEAN", "YEARS_STD"])
+            setattr(self, key_name, results_dict.get(key_name, empty_df))
+
+    @staticmethod
+    def iter_text_features(df_items, workers=1, profiler=None, features=None):
         """
-        Takes data frame and regular expression and returns the amount of times the pattern occurs in the syntax column of the data frame.
-        
+        Generator that calculates the features of the texts one after another, or in a pool of worker processes.
+        Results are returned in the order of the texts, and only a few data frames are waiting for a worker at the same time.
+
+        Input:
+            1. df_items (iterable): Tuples (key, data frame), e.g. df_dict.items()
+            2. workers (int): Number of worker processes. The default value is 1 (no worker processes)
+            3. profiler (profiling.Profiler): Records the timings of the features of every text. The default value is None (no timing)
+            4. features (list): Names of the features. The default value is None (all features)
+        Output:
+            1. Tuples (key, text_feats) with text_feats = dictionary with key = feature name (str) and value = feature value (float)"""
+
+        if workers <= 1:
+            for key, df in df_items:
+                yield key, SynComplMeas.calc_text_features(df, profiler, key, features)
+            return
+
+        def get_result(future):
+            # worker processes return their timings with the features, which are merged into the profiler
+            if profiler is None:
+                return future.result()
+            text_feats, records = future.result()
+            profiler.merge(records)
+            return text_feats
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # futures in the order of the texts (texts are independent of each other)
+            pending = deque()
+            for key, df in df_items:
+                if profiler is None:
+                    future = executor.submit(SynComplMeas.calc_text_features, df, None, None, features)
+                else:
+                    future = executor.submit(SynComplMeas.profile_text_features, df, key, features)
+                pending.append((key, future))
+                # wait for the oldest text when enough texts are waiting
+                if len(pending) >= 2*workers:
+                    key, future = pending.popleft()
+                    yield key, get_result(future)
+            while pending:
+                key, future = pending.popleft()
+                yield key, get_result(future)
+
+    @staticmethod
+    def profile_text_features(df: pd.DataFrame, doc=None, features=None):
+        """
+        Calculates the syntactic complexity features for one text with a new profiler and returns the recorded timings with the features,
+        so that the timings of worker processes can be merged into the profiler of the main process.
+
         Input:
             1. df (Pandas.DataFrame): Data frame with corpus annotations for a text
-            2. regex (str): Regular expression for a pattern
-            3. col (str): Keyword for the column in which the pattern will be counted. It can be "syn" or "xpos".
-                            The default value is "syn" as most patterns are counted in the SYNTAX column
+            2. doc (tuple): Key of the text (year, text number)
+            3. features (list): Names of the features. The default value is None (all features)
         Output:
-            1. pattern_count (int): Number of how often the pattern occured"""
-        
-        if col=="syn":
-            # count pattern in every row for the syntax column, calculate sum
-            pattern_count = df.SYNTAX.str.count(regex).sum()
-        if col=="xpos":
-            # alternatively, count in XPOS-column
-            pattern_count = df.XPOS.str.count(regex).sum()
+            1. text_feats (dict): Dictionary with key = feature name (str) and value = feature value (float) for the text
+            2. records (list): Timings of the steps (see profiling.Profiler)"""
+
+        profiler = Profiler()
+        text_feats = SynComplMeas.calc_text_features(df, profiler, doc, features)
 
-        return pattern_count
+        return text_feats, profiler.records
 
-    def get_tok_embeds(self, df: pd.DataFrame, replace_RE: str):
+    @staticmethod
+    def calc_text_features(df: pd.DataFrame, profiler=None, doc=None, features=None):
         """
-        Calculates the mean token embedding depth in node tagsof a text. The embedding depth for a token is the path from the root node to the terminal node.
+        Calculates the syntactic complexity features for one text. Only the derived columns and counts that the requested features need are calculated.
+        The method does not depend on the object, so texts can be processed independently of each other in worker processes.
 
         Input:
             1. df (Pandas.DataFrame): Data frame with corpus annotations for a text
-            2. replace_RE (str): Regular expression for removing topological field node tags
+            2. profiler (profiling.Profiler): Records wall time of the shared steps and of every feature. The default value is None (no timing)
+            3. doc (tuple): Key of the text (year, text number) for the records of the profiler
+            4. features (list): Names of the features. The default value is None (all features)
         Output:
-            1. tok_embeds (float): Mean token embedding depth for the text"""
+            1. text_feats (dict): Dictionary with key = feature name (str) and value = feature value (float) for the text"""
+
+        features = SynComplMeas.feature_names if features is None else features
+
+        # initialize empty dictionary for saving the feature results of the text
+        text_feats = dict()
+
+        # derived columns of the text, each one is calculated once when a feature needs it
+        memo = TextMemo(df)
 
-        # remove topological field node tags, split at "/", apply function len() to each row in the syntax column, and save Series
-        nodes = df.SYNTAX.str.replace(replace_RE, '', regex=True).str.split("|").apply(len)
+        # time the shared steps and the features of the text (does nothing without profiler)
+        def timer(feature):
+            return timed(profiler, "features", feature, doc, memo.tok_count)
 
-        # mean of the series = mean token embedding depth
-        tok_embeds = nodes.mean()
+        with timer("sent_count"):
+            memo.sent_count
 
-        return tok_embeds
+        # the node tags are only needed for the features that are not calculated from the number of tokens or the XPOS column
+        if FEATURES.needs_nodes(features):
+            with timer("scan_nodes"):
+                # split the syntax column into node tags once and save encoded node tags and token embedding depths
+                memo.depths
 
-    def get_max_embeds(self, df: pd.DataFrame, replace_RE: str, sent_count: int):
+        ### calculate syntactic complexity features
+        for feat_name in features:
+            with timer(feat_name):
+                text_feats[feat_name] = FEATURES.calc_feature(feat_name, memo)
+
+        # derived columns are not needed anymore
+        memo.release()
+
+        return text_feats
+
+    @staticmethod
+    def count_nodes(df: pd.DataFrame, regex: str, prefix_RE=r"B-", skip_adjacent=False):
         """
-        Calculates the mean maximum embedding depth per sentence of a text.
+        Takes data frame and regular expression for a node label and returns how many node tags of the syntax column match the label (see TextMemo.count_nodes).
+        With the default prefix_RE, each node is counted once, which is the same as counting r"(^|\|)(B-)?" + regex in the syntax column.
 
         Input:
-            1. df (Pandas.DataFrame): Data frame with corpus annotations for a text
-            2. replace_RE (str): Regular expression for removing topological field node tags
+            1. df (Pandas.DataFrame): Data frame with corpus annotations for a text or sentence
+            2. regex (str): Regular expression for a node label, e.g. r"[PR]?-?SIMPX"
+            3. prefix_RE (str): Regular expression for the optional prefix of the node tag. The default value is "B-" so that each node is counted once,
+                                use "[BIE]-" to count all node tags that belong to the node
+            4. skip_adjacent (bool): True when only every second one of adjacent matching node tags of a token is counted (see TextMemo.count_nodes).
+                                     The default value is False
         Output:
-            1. max_embeds (float): Mean maximum embedding depth per sentence"""
+            1. node_count (numpy.int64): Number of matching node tags"""
 
-        # create temporary column TEMP with length of the path from terminal node to root node for each token
-        df["TEMP"] = df.SYNTAX.str.replace(replace_RE, '', regex=True).str.split("|").apply(len)
+        return TextMemo(df).count_nodes(regex, prefix_RE, skip_adjacent)
 
-        # list comprehension - iterate over sentences, save maximum embedding depth (value of column TEMP) of each sentence in list
-        max_lens = [np.max(np.array(df[df["SENT_ID"]==i].TEMP)) for i in range(sent_count)]
+    @staticmethod
+    def count_xpos(df: pd.DataFrame, regex: str):
+        """
+        Takes data frame and regular expression and returns how often the pattern occurs in the XPOS column (see TextMemo.count_xpos).
 
-        # delete column TEMP as it is not needed anymore
-        df.drop(labels=["TEMP"], axis=1, inplace=True)
+        Input:
+            1. df (Pandas.DataFrame): Data frame with corpus annotations for a text or sentence
+            2. regex (str): Regular expression for a pattern, e.g. r"VV.*"
+        Output:
+            1. pattern_count (int): Number of how often the pattern occured"""
 
-        # mean maximum embedding depth per sentence = mean of list with maximum embedding depths
-        max_embeds = np.mean(np.array(max_lens))
+        return TextMemo(df).count_xpos(regex)
 
-        return max_embeds
-    
-    def get_clause_lens(self, df: pd.DataFrame, regex: str):
+    @staticmethod
+    def get_tok_embeds(df: pd.DataFrame):
         """
-        Calculates mean clause lengths in tokens of a text by normalizing the number of tokens inside of a clause with the number of clauses.
+        Calculates the mean token embedding depth in node tags of a text (same calculation as feature tok_embeds).
+        The embedding depth for a token is the path from the root node to the terminal node, without topological field node tags.
 
         Input:
-            1. df (Pandas.DataFrame): Data frame with corpus annotations for a text
-            2. regex (str): Regular expression that matches all node tags of the respective clause
+            1. df (Pandas.DataFrame): Data frame with corpus annotations for a text or sentence
         Output:
-            1. clause_len (float): Length of the respective clause in tokens"""
+            1. tok_embeds (float): Mean token embedding depth for the text"""
 
-        # number of tokens inside the clause = length of the dataframes only with tokens that are tagged with the clause's node tags
-        tok_count = len(df[df.SYNTAX.str.contains(r"[BIE]-" + regex)])
+        return get_mean_depth(TextMemo(df))
 
-        # number of clauses = number of node tags that mark the beginning of the clause
-        c_count = df.SYNTAX.str.count(r"(^|\|)(B-)?" + regex).sum()
+    @staticmethod
+    def get_max_embeds(df: pd.DataFrame):
+        """
+        Calculates the mean maximum embedding depth per sentence of a text (same calculation as feature max_sent_embeds).
 
-        clause_len = tok_count/c_count
+        Input:
+            1. df (Pandas.DataFrame): Data frame with corpus annotations for a text or sentence
+        Output:
+            1. max_embeds (float): Mean maximum embedding depth per sentence"""
 
-        return clause_len
-    
-    def get_phrase_lens(self, df: pd.DataFrame, regex: str):
+        return get_mean_max_depth(TextMemo(df))
+
+    @staticmethod
+    def get_sent_depths(depths, sent_ids):
         """
-        Calculates the mean phrase or field length in node tags or tokens by normalizing the number of node tags inside of a phrase/field with the number of phrases/fields.
+        Calculates the maximum embedding depth of each sentence of a text in one grouped operation.
 
         Input:
-            1. df (Pandas.DataFrame): Data frame with corpus annotations for a text
-            2. regex (str): Regular expression that matches all node tags of the respective phrase/field
+            1. depths (numpy.ndarray or Pandas.Series): Embedding depth of each token (see TextMemo.depths)
+            2. sent_ids (numpy.ndarray or Pandas.Series): Sentence ID of each token (column SENT_ID)
         Output:
-            1. phrase_len (float): Length of the phrase/field in node tags or tokens"""
+            1. sent_depths (numpy.ndarray): Maximum embedding depth of each sentence, ordered by sentence ID"""
 
-        # number of node tags in phrase/field = sum of all phrase/field node tags in the syntax column
-        phrase_tag_count = df.SYNTAX.str.count(r"(^|\|)([BIE]-)?" + regex).sum()
+        sent_depths = pd.Series(np.asarray(depths)).groupby(np.asarray(sent_ids), sort=True).max().to_numpy()
+
+        return sent_depths
+
+    @staticmethod
+    def get_phrase_lens(df: pd.DataFrame, regex: str):
+        """
+        Calculates the mean phrase, field or clause length in node tags by normalizing the number of node tags of a phrase/field with the number of phrases/fields
+        (same calculation as the length features, e.g. nx_lens).
+
+        Input:
+            1. df (Pandas.DataFrame): Data frame with corpus annotations for a text or sentence
+            2. regex (str): Regular expression for the node label of the phrase/field, e.g. r"NX"
+        Output:
+            1. phrase_len (float): Length of the phrase/field in node tags"""
 
-        # number of phrases/fields = sum of all node tags that mark the beginning of a phrase/field
-        phrase_count = df.SYNTAX.str.count(r"(^|\|)(B-)?" + regex).sum()
+        memo = TextMemo(df)
 
-        phrase_len = phrase_tag_count/phrase_count
+        # number of node tags in phrase/field divided by number of node tags that mark the beginning of a phrase/field
+        phrase_len = memo.count_nodes(regex, prefix_RE=r"[BIE]-")/memo.count_nodes(regex)
 
         return phrase_len
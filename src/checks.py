@@ -0,0 +1,161 @@
+# consistency checks for the complexity measures on small hand-made examples and synthetic data
+# every check raises an AssertionError with a message if the result differs from the expected one
+
+# usage (call from root dir):
+# python3 src/checks.py
+# python3 src/checks.py --only adjacent_c_nodes
+
+import os
+import sys
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from functions import get_filenames, read_conllup
+from calc_syn_complexity import SynComplMeas, FEATURES
+from tree_to_bio import convert_corpus
+from feature_store import update_feature_store, make_feat_lists
+import ngram_model
+
+
+######################################
+def check_adjacent_c_nodes():
+    """
+    Regression example for adjacent C nodes (e.g. a C field directly inside a C field, SYNTAX "B-C|B-C"): subc_s and subc_c are the same as with
+    the regex count r"(^|\|)(B-)?C($|\|)" of the result files, which consumes the "|" between two adjacent C node tags and counts only one of them."""
+
+    subc_RE = r"(^|\|)(B-)?C($|\|)"
+
+    examples = [
+        (["B-SIMPX|B-C|B-C", "I-SIMPX|NN", "E-SIMPX|NN"], 1),
+        (["B-SIMPX|C|C|KOUS", "I-SIMPX|B-C|NN", "I-SIMPX|E-C|VVFIN"], 2),
+        (["B-SIMPX|C|C|C|KOUS", "I-SIMPX|B-C|C|NX|C|NN", "E-SIMPX|I-C|C|VVFIN"], 5),
+    ]
+
+    for syntax, expected in examples:
+        df = pd.DataFrame({"SENT_ID": [0]*len(syntax), "SYNTAX": syntax, "XPOS": ["NN"]*len(syntax)})
+        text_feats = SynComplMeas.calc_text_features(df, features=["subc_s", "subc_c"])
+        regex_count = df.SYNTAX.str.count(subc_RE).sum()
+
+        assert regex_count == expected, "regex count: expected %d, got %s" % (expected, regex_count)
+        assert text_feats["subc_s"] == expected, "subc_s of %s: expected %d, got %s" % (syntax, expected, text_feats["subc_s"])
+        assert text_feats["subc_c"] == expected, "subc_c of %s: expected %d, got %s" % (syntax, expected, text_feats["subc_c"])
+
+
+######################################
+def check_tree_to_bio_formats(path="data/", filenames=("express_1.parsed", "zeit_3.parsed")):
+    """
+    Checks that the conllup and the Parquet output of tree_to_bio.py give the same SynComplMeas results.
+
+        Input:
+            1. path (str): Path to the files with bracketed trees
+            2. filenames (tuple): Filenames of the files with bracketed trees"""
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conllup_files = convert_corpus(path, list(filenames), tmp_dir, fmt="conllup")
+        parquet_files = convert_corpus(path, list(filenames), tmp_dir, fmt="parquet")
+
+        conllup_dict = {(1, i+1): read_conllup(filepath, columns=["SENT_ID", "SYNTAX", "XPOS"]) for i, filepath in enumerate(conllup_files)}
+        parquet_dict = {(1, i+1): pd.read_parquet(filepath) for i, filepath in enumerate(parquet_files)}
+
+    conllup_values = SynComplMeas("conllup", conllup_dict).values
+    parquet_values = SynComplMeas("parquet", parquet_dict).values
+
+    pd.testing.assert_frame_equal(conllup_values, parquet_values, check_exact=False)
+
+
+######################################
+def check_registered_feature_store(path="data/", filenames_categorized="src/demo_dataSplits.csv"):
+    """
+    Checks that a feature that is registered after the feature store has been filled is calculated by update_feature_store
+    (only for the missing feature) and is returned by make_feat_lists with the same values as calc_text_features,
+    and that the feature is calculated again when its definition changes.
+
+        Input:
+            1. path (str): Path to the conllup files
+            2. filenames_categorized (str): File with the data split of the conllup files"""
+
+    filenames = get_filenames(filenames_categorized, test=True)[:4]
+    feat_name = "check_px_s"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store_file = os.path.join(tmp_dir, "feature_store.parquet")
+        store = update_feature_store(path, filenames, store_file)
+
+        FEATURES.add_ratio(feat_name, "px")
+        try:
+            new_store = update_feature_store(path, filenames, store_file)
+            feat_lists = make_feat_lists(new_store, path, filenames)
+            expected = [SynComplMeas.calc_text_features(read_conllup(path+filename), features=[feat_name])[feat_name] for filename in filenames]
+
+            # same name, other definition
+            FEATURES.add_ratio(feat_name, "px", per="clauses")
+            changed_store = update_feature_store(path, filenames, store_file)
+            changed_lists = make_feat_lists(changed_store, path, filenames)
+            changed_expected = [SynComplMeas.calc_text_features(read_conllup(path+filename), features=[feat_name])[feat_name] for filename in filenames]
+        finally:
+            # remove the feature from the registry again
+            del FEATURES.features[feat_name]
+            FEATURES.names.remove(feat_name)
+
+    # the stored features are kept, only the new feature is added
+    assert len(new_store) == len(store) + len(filenames), "expected %d rows, got %d" % (len(store) + len(filenames), len(new_store))
+    old_rows = new_store[new_store.FEATURE != feat_name].sort_values(["FILE", "FEATURE"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(old_rows, store.sort_values(["FILE", "FEATURE"]).reset_index(drop=True))
+
+    assert [val for _, _, val in feat_lists[feat_name]] == expected, "values of %s differ from calc_text_features" % feat_name
+
+    assert len(changed_store) == len(new_store), "expected %d rows, got %d" % (len(new_store), len(changed_store))
+    assert changed_expected != expected, "the changed definition of %s gives the same values" % feat_name
+    assert [val for _, _, val in changed_lists[feat_name]] == changed_expected, "values of %s were not calculated again" % feat_name
+    assert set(changed_store.FILE) == {"data/" + filename for filename in filenames}, "files are not stored with their path relative to the root dir"
+
+
+######################################
+def check_kneser_ney_sum(order=3):
+    """
+    Checks that the probabilities of all tags that can be predicted (tags of the vocabulary without "<s>" and the id for unknown tags)
+    sum to 1 after seen histories of a Kneser-Ney model.
+
+        Input:
+            1. order (int): Order of the model"""
+
+    sentences = [["ART", "NN", "VVFIN", "$."], ["PPER", "VVFIN", "ART", "ADJA", "NN", "$."], ["NE", "VAFIN", "ADV", "ADJD", "$."], ["ART", "NN", "VAFIN", "ADJD", "$."]]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filepath = os.path.join(tmp_dir, "tagged.txt")
+        with open(filepath, "w", encoding="UTF-8") as outfile:
+            outfile.write("".join(" ".join(tags) + " \n" for tags in sentences))
+        model = ngram_model.KneserNeyModel.from_files([filepath], order=order)
+
+    bos = model.vocab.tag_ids[ngram_model.BOS]
+    outcomes = [tag_id for tag_id in range(len(model.vocab)) if tag_id != bos] + [model.base - 1]
+
+    for history in [[], ["ART"], ["ART", "NN"], ["VVFIN", "ART"]]:
+        history_ids = [bos]*(order - 1) + [model.vocab.tag_ids[tag] for tag in history]
+        probs = [np.exp(model.log_probs(np.array(history_ids + [tag_id], dtype=np.int64))[-1]) for tag_id in outcomes]
+        assert np.isclose(sum(probs), 1), "probabilities after %s sum to %s" % (history, sum(probs))
+
+
+# checks by name
+CHECKS = {
+    "adjacent_c_nodes": check_adjacent_c_nodes,
+    "tree_to_bio_formats": check_tree_to_bio_formats,
+    "registered_feature_store": check_registered_feature_store,
+    "kneser_ney_sum": check_kneser_ney_sum,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the consistency checks of the complexity measures.")
+    parser.add_argument("--only", nargs="*", help="names of the checks to run")
+    args = parser.parse_args()
+
+    for name, check in CHECKS.items():
+        if args.only and name not in args.only:
+            continue
+        check()
+        print("%-24s ok" % name)
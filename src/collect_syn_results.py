@@ -1,74 +1,37 @@
 # author: Stefanie Dipper
-# read in multiple syntax result files
-# and collect results in one file 'data_tmp/syntax/syntax_all.csv'
+# collect the syntax results of all features in one file 'results/3_syntax/significance/syntax_all.csv' for calc_syn_significance.R
+# the text values are read from the result store (results/results.parquet, see result_store.py);
+# the result files in input_dir are imported first if the store has no results for the corpus and split yet or if a result file is newer than the store
 
 # usage (call from root dir):
 # python3 src/collect_syn_results.py
 
+import os
 import sys
-from pathlib import Path
-import csv, ast
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from result_store import STORE_FILE, read_results, import_csv_results
 
 input_dir = "results/3_syntax/test_results/"
 out_dir = "results/3_syntax/significance/"
 output_file = out_dir + "syntax_all.csv"
-import os
+corpus, split = "abitur", "test"
 os.makedirs(out_dir, exist_ok=True)
 
-source_dir = Path(input_dir)
-files = source_dir.iterdir()
-
 # key1: year
 # key2: feature
 # key3: student_no
 # value: score
-mydict = dict()
-
-# parallel lists for all columns
-years = list()
-features = list()
-student_no = list()
-scores = list()
-
-count = 0
-
-# Ueber Dateien in Verzeichnis iterieren
-for file in files:
-    filename = Path(file).stem
-
-    # Ab hier kann man jeweils auf 1 Datei zugreifen, z.B. so:
-    with open(file, mode="r", encoding="UTF-8") as infile:
-        count = 0
-        csv_reader = csv.reader(infile, delimiter=',')
-        # skip first line
-        next(csv_reader)
-        for line in csv_reader:
-            for (i, elt) in enumerate(line):
-                if i in [0, 1]: line[i] = int(line[i])
-                if i in [2, 4, 5, 6]: line[i] = float(line[i])
-                if i == 3:
-                    line[i] = ast.literal_eval(line[i])
-                    #for val in line[i]:
-                    #    line[i][val] = float(line[i])
-                    
-            (no, year, avg_year, values, sd, mean_all, sd_all) = line
-            for val in values:
-                count += 1
-                years.append(year)
-                features.append(filename)
-                student_no.append(count)
-                scores.append(val)
+import_csv_results(input_dir, corpus, split, STORE_FILE)
+df = read_results(STORE_FILE, corpus, split, columns=["FEATURE", "YEAR", "DOC", "VALUE"])
 
+# students are numbered per feature, in the order of the years and texts
+df = df.sort_values(["FEATURE", "YEAR", "DOC"], kind="stable")
+df["student"] = df.groupby("FEATURE", sort=False).cumcount() + 1
 
 # print output
+df = df.rename(columns={"YEAR": "year", "FEATURE": "measure", "VALUE": "score"})[["year", "measure", "student", "score"]]
 with open(output_file, mode="w") as outfile:
-    print("year", "measure", "student", "score",
-          sep="\t", file=outfile)
-                
-    for i in range(len(years)):
-        print(years[i],
-              features[i],
-              student_no[i],
-              scores[i],
-              sep="\t", file=outfile)
+    df.to_csv(outfile, sep="\t", index=False)
     print(file=outfile)
@@ -0,0 +1,168 @@
+# per-text store of the syntactic complexity features, so that reruns only calculate texts that are new or have changed
+# the store has one row per text and feature with the columns FILE (path relative to the root dir), HASH (hash of the file content), YEAR, FEATURE,
+# DEFINITION (fingerprint of the feature definition, see FeatureRegistry.get_fingerprint) and VALUE
+# stored values are calculated again when the file content or the definition of the feature has changed
+
+# usage (call from root dir), e.g. in 3_syntactic_complexity.ipynb:
+# from feature_store import update_feature_store, make_feat_lists
+# store = update_feature_store("data/", filenames)
+# sc = SynComplMeas.from_feat_lists("Syntactical Complexity Measures", make_feat_lists(store, "data/", filenames))
+
+# import modules
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+from functions import get_file_hash, read_conllup, load_conllup
+from calc_syn_complexity import SynComplMeas, FEATURES
+
+STORE_COLUMNS = ["FILE", "HASH", "YEAR", "FEATURE", "DEFINITION", "VALUE"]
+
+
+def get_store_file(path: str, filename: str, root="."):
+    """
+    Function that returns the key of a file in the feature store: the path of the file relative to the root dir, so that files with the same name
+    in different corpora do not collide.
+
+        Input:
+            1. path (str): Path to the file on the computer
+            2. filename (str): Filename
+            3. root (str): Root dir of the data. The default value is "." (scripts are called from the root dir)
+        Output:
+            1. store_file (str): Relative path with "/" as separator (e.g. "data/1963_DE_K1_11_M_08P.conllup")"""
+
+    return os.path.relpath(os.path.join(path, filename), root).replace(os.sep, "/")
+
+
+def read_feature_store(store_file: str):
+    """
+    Function that reads the feature store from a Parquet file, or returns an empty store if the file does not exist yet.
+
+        Input:
+            1. store_file (str): Path to the store file
+        Output:
+            1. store (Pandas.DataFrame): Data frame with the columns FILE, HASH, YEAR, FEATURE, DEFINITION, VALUE"""
+
+    if os.path.exists(store_file):
+        store = pd.read_parquet(store_file)
+        # stores without fingerprints are outdated
+        if "DEFINITION" not in store:
+            store.insert(STORE_COLUMNS.index("DEFINITION"), "DEFINITION", pd.Series(None, index=store.index, dtype=object))
+    else:
+        store = pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in zip(STORE_COLUMNS, [object, object, "int64", object, object, "float64"])})
+
+    return store
+
+
+def calc_file_features(filepath: str, cache_dir=None, features=None):
+    """
+    Function that loads a conllup file and calculates the syntactic complexity features for it (used by the worker processes of update_feature_store).
+
+        Input:
+            1. filepath (str): Path to the conllup file
+            2. cache_dir (str): Directory of the data frame cache (see functions.load_conllup), None for no cache
+            3. features (list): Names of the features. The default value is None (all features)
+        Output:
+            1. text_feats (dict): Dictionary with key = feature name (str) and value = feature value (float)"""
+
+    if cache_dir is None:
+        df = read_conllup(filepath, columns=["SENT_ID", "SYNTAX", "XPOS"])
+    else:
+        df = load_conllup(filepath, cache_dir=cache_dir, columns=["SENT_ID", "SYNTAX", "XPOS"])
+
+    return SynComplMeas.calc_text_features(df, features=features)
+
+
+def update_feature_store(path: str, filenames: list, store_file="data_tmp/syntax/feature_store.parquet", workers=1, cache_dir=None, root="."):
+    """
+    Function that brings the feature store up to date for the given files: features are only calculated for files that are not in the store yet
+    or whose content has changed since they were stored (all features), and for features that are missing in the store for a file,
+    e.g. features that have been registered after the file was stored or whose definition has changed (only these features).
+    Rows of other files (e.g. of another data split) are kept.
+
+        Input:
+            1. path (str): Path to the files on the computer
+            2. filenames (list): List with the filenames of the conllup files (str), e.g. from functions.get_filenames
+            3. store_file (str): Path to the store file
+            4. workers (int): Number of worker processes for calculating the features. The default value is 1 (no worker processes)
+            5. cache_dir (str): Directory of the data frame cache (see functions.load_conllup). The default value is None (no cache)
+            6. root (str): Root dir of the data, the files are stored with their path relative to it (see get_store_file). The default value is "."
+        Output:
+            1. store (Pandas.DataFrame): Updated store with the columns FILE, HASH, YEAR, FEATURE, DEFINITION, VALUE"""
+
+    store = read_feature_store(store_file)
+
+    # stored features of every file for its current content and the current feature definitions
+    store_files = {filename: get_store_file(path, filename, root) for filename in filenames}
+    file_hashes = {store_files[filename]: get_file_hash(path+filename) for filename in filenames}
+    fingerprints = {feat_name: FEATURES.get_fingerprint(feat_name) for feat_name in SynComplMeas.feature_names}
+    current = store[(store.HASH == store.FILE.map(file_hashes)) & (store.DEFINITION == store.FEATURE.map(fingerprints))]
+    stored_feats = current.groupby("FILE").FEATURE.agg(set).to_dict()
+
+    # features that have to be (re)calculated per file = features without a stored row for the current content of the file and definition of the feature
+    missing = dict()
+    for filename in filenames:
+        feats = [feat_name for feat_name in SynComplMeas.feature_names if feat_name not in stored_feats.get(store_files[filename], set())]
+        if feats:
+            missing[filename] = feats
+
+    if not missing:
+        return store
+
+    new_files = [store_files[filename] for filename in missing]
+    filepaths = [path+filename for filename in missing]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            all_text_feats = list(executor.map(calc_file_features, filepaths, [cache_dir]*len(filepaths), list(missing.values())))
+    else:
+        all_text_feats = [calc_file_features(filepath, cache_dir, feats) for filepath, feats in zip(filepaths, missing.values())]
+
+    # one row per file and calculated feature
+    rows = [[store_files[filename], file_hashes[store_files[filename]], int(re.match(r"^(\d{4})_", filename).group(1)), feat_name, fingerprints[feat_name],
+             float(text_feats[feat_name])] for filename, text_feats in zip(missing, all_text_feats) for feat_name in missing[filename]]
+
+    # keep the rows of the files that are still valid (current content and definition, features that have not been calculated again), add the new rows
+    recalculated = {(store_files[filename], feat_name) for filename, feats in missing.items() for feat_name in feats}
+    recalc_rows = pd.Series([pair in recalculated for pair in zip(store.FILE, store.FEATURE)], index=store.index, dtype=bool)
+    keep = ~store.FILE.isin(new_files) | (store.index.isin(current.index) & ~recalc_rows)
+    store = pd.concat([store[keep], pd.DataFrame(rows, columns=STORE_COLUMNS)], ignore_index=True)
+
+    # write to a temporary file first, so an interrupted run does not destroy the store
+    os.makedirs(os.path.dirname(store_file) or ".", exist_ok=True)
+    store.to_parquet(store_file + ".tmp", index=False)
+    os.replace(store_file + ".tmp", store_file)
+
+    return store
+
+
+def make_feat_lists(store: pd.DataFrame, path: str, filenames: list, root="."):
+    """
+    Function that takes the feature store and the filenames of a data split and returns the feature results in the form used by SynComplMeas.
+    Text numbers are assigned per year in the order of the filenames, like in functions.make_df_dict.
+
+        Input:
+            1. store (Pandas.DataFrame): Feature store with the columns FILE, HASH, YEAR, FEATURE, DEFINITION, VALUE
+            2. path (str): Path to the files on the computer
+            3. filenames (list): List with the filenames of the conllup files (str)
+            4. root (str): Root dir of the data (see get_store_file). The default value is "."
+        Output:
+            1. feat_lists (dict): Dictionary with key = feature name (str) and value = list of lists [year, text number, text value] for each text"""
+
+    # text number of each file = position among the files of the same year
+    year_counts = dict()
+    text_nos = dict()
+    for filename in filenames:
+        year = int(re.match(r"^(\d{4})_", filename).group(1))
+        year_counts[year] = year_counts.get(year, 0) + 1
+        text_nos[get_store_file(path, filename, root)] = (year, year_counts[year])
+
+    # store rows of the files, in the order of the filenames
+    split_store = store[store.FILE.isin(text_nos)]
+    values = dict(zip(zip(split_store.FILE, split_store.FEATURE), split_store.VALUE))
+
+    feat_lists = dict()
+    for feat_name in SynComplMeas.feature_names:
+        feat_lists[feat_name] = [[year, no, values[(filename, feat_name)]] for filename, (year, no) in text_nos.items()]
+
+    return feat_lists
@@ -6,9 +6,16 @@ Created on Thu Feb 24 19:29:14 2022
 """
 
 # import modules
+import os
+import hashlib
 import pandas as pd
 import numpy as np
 
+from profiling import timed
+
+# version of the cleaned data frames in the cache (increase when read_conllup changes its output)
+CACHE_VERSION = 1
+
 def get_filenames(filenames_categorized: str, test: bool):
     """
     Function that takes .csv-File with the filenames that have been categorized into dev or test files and returns either the filenames for the development data or the filenames for the test data.
@@ -32,15 +39,224 @@ def get_filenames(filenames_categorized: str, test: bool):
 
 
 ######################################
-def make_df_dict(path: str, filenames: list):
+def read_conllup(filepath: str, columns=["SENT_ID", "SYNTAX", "XPOS"], skip_headlines=True, skip_empty=True, skip_parts=True):
     """
-    Function that takes a list of filenames, loads the conllup files into a data frame, and saves them in a dictionary with the key tuples (year, text number).
+    Function that reads a conllup file line by line in one pass and returns a data frame with only the wanted columns.
+    Rows are filtered and sentence IDs are assigned while reading, so the other annotation columns are never stored.
+
+        Input:
+            1. filepath (str): Path to the conllup file
+            2. columns (list): Names of the columns to keep (str). "SENT_ID" is the sentence ID, starting from 0
+            3. skip_headlines (bool): True when rows that are headlines (column UEBERSCHRIFT not "0") should be deleted (only if the file has this column)
+            4. skip_empty (bool): True when rows with no words (FORM contains "EMPTY") should be deleted
+            5. skip_parts (bool): True when superfluous rows for only one word (FORM contains "<I->" or "<E->") should be deleted
+        Output:
+            1. df (Pandas.DataFrame): Data frame with the wanted columns"""
+
+    with open(filepath, "r", encoding="UTF-8") as file:
+        # use first line for saving the column names
+        column_names = file.readline().replace("# global.columns =", "").strip().split()
+
+        id_idx = column_names.index("ID")
+        form_idx = column_names.index("FORM")
+        headline_idx = column_names.index("UEBERSCHRIFT") if skip_headlines and "UEBERSCHRIFT" in column_names else None
+
+        # column indices of the wanted columns (SENT_ID is not a column of the file)
+        keep_idx = [column_names.index(col) for col in columns if col != "SENT_ID"]
+        # only split each line up to the last column that is needed
+        max_idx = max(keep_idx + [id_idx, form_idx] + ([headline_idx] if headline_idx is not None else []))
+
+        # one list of values per wanted column
+        values = {idx: list() for idx in keep_idx}
+        sent_ids = list()
+        sent_id = -1
+
+        for line in file:
+            # skip comments and empty lines
+            if line.startswith("#") or not line.strip():
+                continue
+
+            fields = line.rstrip("\n").split("\t", max_idx + 1)
+
+            # delete rows that are headlines
+            if headline_idx is not None and fields[headline_idx] != "0":
+                continue
+
+            # new sentence at token ID 1 (the first row always starts a sentence)
+            if sent_id == -1 or fields[id_idx] == "1":
+                sent_id += 1
+
+            form = fields[form_idx]
+            # delete rows with no words
+            if skip_empty and "EMPTY" in form:
+                continue
+            # delete superfluous rows for only one word
+            if skip_parts and ("<I->" in form or "<E->" in form):
+                continue
+
+            sent_ids.append(sent_id)
+            for idx in keep_idx:
+                values[idx].append(fields[idx])
+
+    # create data frame with the wanted columns in the given order
+    df = pd.DataFrame({col: np.array(sent_ids, dtype=np.int64) if col == "SENT_ID" else values[column_names.index(col)] for col in columns})
+
+    return df
+
+
+######################################
+def iter_sentence_forms(filepath: str, skip_headlines=True):
+    """
+    Generator that reads a conllup file line by line and yields the word forms of one sentence at a time, without building a data frame.
+    Words that are split into several rows are merged ("<B->" row is kept without prefix, "<I->" and "<E->" rows are deleted), rows with no words ("<EMPTY>") are deleted.
+
+        Input:
+            1. filepath (str): Path to the conllup file
+            2. skip_headlines (bool): True when rows that are headlines (column UEBERSCHRIFT not "0") should be deleted (only if the file has this column)
+        Output:
+            1. Lists of the word forms of a sentence (str); sentences without words are not yielded"""
+
+    with open(filepath, "r", encoding="UTF-8") as file:
+        # use first line for saving the column names
+        column_names = file.readline().replace("# global.columns =", "").strip().split()
+
+        id_idx = column_names.index("ID")
+        form_idx = column_names.index("FORM")
+        headline_idx = column_names.index("UEBERSCHRIFT") if skip_headlines and "UEBERSCHRIFT" in column_names else None
+        max_idx = max([id_idx, form_idx] + ([headline_idx] if headline_idx is not None else []))
+
+        forms = list()
+
+        for line in file:
+            # skip comments and empty lines
+            if line.startswith("#") or not line.strip():
+                continue
+
+            fields = line.rstrip("\n").split("\t", max_idx + 1)
+
+            # new sentence at token ID 1
+            if fields[id_idx] == "1" and forms:
+                yield forms
+                forms = list()
+
+            # delete rows that are headlines
+            if headline_idx is not None and fields[headline_idx] != "0":
+                continue
+
+            form = fields[form_idx].strip(" ")
+            if form[:4] == "<B->":
+                forms.append(form[4:])
+            elif form[:4] in ("<I->", "<E->") or form[:7] == "<EMPTY>":
+                continue
+            else:
+                forms.append(form)
+
+        if forms:
+            yield forms
+
+
+######################################
+def get_file_hash(filepath: str):
+    """
+    Function that returns a hash of the content of a file, so that changed files can be recognized.
+
+        Input:
+            1. filepath (str): Path to the file
+        Output:
+            1. file_hash (str): SHA-1 hash of the file content as hex string"""
+
+    with open(filepath, "rb") as file:
+        file_hash = hashlib.sha1(file.read()).hexdigest()
+
+    return file_hash
+
+
+def load_conllup(filepath: str, cache_dir="data_tmp/cache/", max_size=2**30, **read_options):
+    """
+    Function that returns the cleaned data frame of a conllup file (see read_conllup) from an on-disk cache of Parquet files, and only parses the file if it is not cached yet.
+    Cache entries are keyed by the content of the file and the options for reading it, so entries of changed files are never used and are deleted.
+    Least recently used entries are deleted when the cache is larger than max_size.
+
+        Input:
+            1. filepath (str): Path to the conllup file
+            2. cache_dir (str): Directory for the cache files
+            3. max_size (int): Maximum size of the cache in bytes
+            4. read_options: Keyword arguments for read_conllup (columns, skip_headlines, skip_empty, skip_parts)
+        Output:
+            1. df (Pandas.DataFrame): Data frame with the wanted columns"""
+
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # hash of the file content
+    content_hash = get_file_hash(filepath)
+
+    # hash of the options that are used for cleaning the data (defaults of read_conllup are included)
+    options = {"columns": ["SENT_ID", "SYNTAX", "XPOS"], "skip_headlines": True, "skip_empty": True, "skip_parts": True}
+    options.update(read_options)
+    options_hash = hashlib.sha1(repr((CACHE_VERSION, sorted(options.items()))).encode("UTF-8")).hexdigest()
+
+    # cache filename = filename + hash of the path + hash of the content + hash of the options
+    prefix = os.path.basename(filepath) + "." + hashlib.sha1(os.path.abspath(filepath).encode("UTF-8")).hexdigest()[:8] + "."
+    cache_file = os.path.join(cache_dir, prefix + content_hash[:16] + "." + options_hash[:16] + ".parquet")
+
+    if os.path.exists(cache_file):
+        # mark entry as recently used
+        os.utime(cache_file)
+        return pd.read_parquet(cache_file)
+
+    # delete stale entries of the file (previous content of the file)
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(prefix) and not entry.startswith(prefix + content_hash[:16] + "."):
+            os.remove(os.path.join(cache_dir, entry))
+
+    df = read_conllup(filepath, **options)
+    # write to a temporary file first, so other processes never read incomplete entries
+    df.to_parquet(cache_file + ".tmp", index=False)
+    os.replace(cache_file + ".tmp", cache_file)
+
+    evict_cache(cache_dir, max_size)
+
+    return df
+
+
+def evict_cache(cache_dir: str, max_size: int):
+    """
+    Function that deletes the least recently used files of a cache directory until the directory is not larger than max_size.
+
+        Input:
+            1. cache_dir (str): Directory of the cache files
+            2. max_size (int): Maximum size of the cache in bytes
+        Output:
+            1. size (int): Size of the cache in bytes after deleting files"""
+
+    entries = [os.path.join(cache_dir, entry) for entry in os.listdir(cache_dir) if entry.endswith(".parquet")]
+    # sort by time of last use, most recently used first
+    entries.sort(key=os.path.getmtime, reverse=True)
+
+    size = 0
+    for entry in entries:
+        entry_size = os.path.getsize(entry)
+        if size + entry_size > max_size:
+            os.remove(entry)
+        else:
+            size += entry_size
+
+    return size
+
+
+######################################
+def iter_dfs(path: str, filenames: list, cache_dir=None, profiler=None):
+    """
+    Generator that takes a list of filenames and loads the conllup files into data frames one after another, so that only one data frame has to be in memory at a time
+    (e.g. for SynComplMeas in streaming mode). The keys are the same as in make_df_dict.
 
         Input:
             1. path (str): Path to the files on the computer
             2. filenames (list): List with the filenames of the conllup files (str)
+            3. cache_dir (str): Directory for caching the data frames (see load_conllup), e.g. "data_tmp/cache/". The default value is None (no cache)
+            4. profiler (profiling.Profiler): Records the loading time of every file (phase "load"). The default value is None (no timing)
         Output:
-            1. dfs_dict (dict): Dictionary with key = tuple (year, text number) and value = data frame"""
+            1. Tuples (key, df) with key = tuple (year, text number) and df = data frame"""
     
     # load filenames into data frame with one column
     df_files = pd.DataFrame(filenames, columns=["filenames"])
@@ -51,45 +267,42 @@ def make_df_dict(path: str, filenames: list):
     # make set of years
     years = set(df_files.year)
 
-    # initialize dictionary for saving data frames
-    dfs_dict = dict()
-
     for year in years:
         # save filenames of the "current" year in list
         filenames = list(df_files.filenames[df_files["year"] == year])
 
         for i, filename in enumerate(filenames):
 
-            # open connlup file and use first line for saving the column names for data frame
-            with open(path+filename, "r", encoding="UTF-8") as file:
-                column_names = file.readline().replace("# global.columns =", "").strip().split()
+            # key (year, text number)
+            key = (int(year), i+1)
 
-            # load connlup file into data frame
-            df = pd.read_csv(path+filename, comment="#", sep="\t", quoting=3, header=None, names=column_names)
+            with timed(profiler, "load", "read_conllup" if cache_dir is None else "load_conllup", key) as entry:
+                # read connlup file in one pass, keep only the columns that are needed
+                # (headlines, rows with no words and superfluous rows for only one word are deleted while reading)
+                if cache_dir is None:
+                    df = read_conllup(path+filename, columns=["SENT_ID", "SYNTAX", "XPOS"])
+                else:
+                    df = load_conllup(path+filename, cache_dir=cache_dir, columns=["SENT_ID", "SYNTAX", "XPOS"])
+                if entry is not None:
+                    entry["TOKENS"] = len(df)
 
-            # convert all headline column values into strings
-            df = df.astype({"UEBERSCHRIFT": "string"})
-            # delete rows that are headlines
-            df = df[df.UEBERSCHRIFT == "0"]
-            # reset index
-            df.reset_index(drop=True, inplace=True)
+            yield key, df
 
-            # add column "SENT_ID" with sent IDs, starting from 0
-            df.loc[[0],["ID"]] = 1
-            df["SENT_ID"] = df.ID.eq(1).cumsum() - 1
 
-            # delete rows with no words
-            df = df[~df.FORM.str.contains("EMPTY")]
-            # delete superfluous rows for only one word
-            df = df[~df.FORM.str.contains(r"<[IE]->")]
-            # reset index
-            df.reset_index(drop=True, inplace=True)
-
-            # only keep columns that are needed
-            keep = ["SENT_ID", "SYNTAX", "XPOS"]
-            df = df[keep]
-            
-            # add data frame to dictionary with key (year, text number)
-            dfs_dict[(int(year), i+1)] = df
+######################################
+def make_df_dict(path: str, filenames: list, cache_dir=None, profiler=None):
+    """
+    Function that takes a list of filenames, loads the conllup files into a data frame, and saves them in a dictionary with the key tuples (year, text number).
+
+        Input:
+            1. path (str): Path to the files on the computer
+            2. filenames (list): List with the filenames of the conllup files (str)
+            3. cache_dir (str): Directory for caching the data frames (see load_conllup), e.g. "data_tmp/cache/". The default value is None (no cache)
+            4. profiler (profiling.Profiler): Records the loading time of every file (see iter_dfs). The default value is None (no timing)
+        Output:
+            1. dfs_dict (dict): Dictionary with key = tuple (year, text number) and value = data frame"""
+
+    # save data frames in dictionary with key (year, text number)
+    dfs_dict = dict(iter_dfs(path, filenames, cache_dir=cache_dir, profiler=profiler))
 
     return dfs_dict
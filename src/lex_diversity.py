@@ -0,0 +1,437 @@
+# lexical diversity measures for lemma lists (see 1_lexical_diversity.ipynb)
+# lemmas are interned to integer ids once per text, so the measures can be calculated with NumPy instead of rebuilding dictionaries
+# compute_lex_diversity / batch_lex_diversity calculate MTLD, MSTTR, HD-D and MATTR together from the same arrays
+
+# import modules
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import numpy as np
+from scipy.special import gammaln
+
+# names of the lexical diversity measures (as in the results in results/1_lex/)
+MEASURE_NAMES = ["MTLD", "MSTTR", "HD-D", "MATTR"]
+
+# probabilities that a lemma does not occur in a random sample, key = (text length, lemma frequency, sample size)
+# (many lemmas of all texts share the same frequency, so each probability is only calculated once)
+P_ZERO_CACHE = dict()
+
+
+######################################
+def intern_lemmas(lemma_list):
+    """
+    Function that replaces the lemmas of a text by integer ids (in order of first occurrence).
+    Missing lemmas (NaN, e.g. from pd.read_csv) are one lemma type, like in the functions of 1_lexical_diversity.ipynb.
+
+        Input:
+            1. lemma_list (list): Lemmas of a text (str)
+        Output:
+            1. ids (numpy.ndarray): Lemma id of every token (int64)
+            2. types (numpy.ndarray): Lemma of every id"""
+
+    ids, types = pd.factorize(pd.Series(lemma_list, dtype=object), sort=False, use_na_sentinel=False)
+
+    return ids.astype(np.int64), types
+
+
+######################################
+def get_prev_positions(ids: np.ndarray):
+    """
+    Function that returns for every token the position of the previous token with the same lemma id (-1 for the first occurrence).
+    The positions are sorted by lemma id with a stable sort (O(n log n)), so consecutive positions of the sorted array with the same id are successive occurrences.
+
+        Input:
+            1. ids (numpy.ndarray): Lemma id of every token
+        Output:
+            1. prev (numpy.ndarray): Position of the previous occurrence of the lemma (int64)"""
+
+    # sort positions by lemma id, positions of the same lemma stay in text order
+    order = np.argsort(ids, kind="stable")
+    prev = np.full(len(ids), -1, dtype=np.int64)
+
+    same = ids[order[1:]] == ids[order[:-1]]
+    prev[order[1:][same]] = order[:-1][same]
+
+    return prev
+
+
+######################################
+def get_window_types(ids: np.ndarray, window=500, prev=None):
+    """
+    Function that counts the word types in every window of a sliding window over the text. Given the previous occurrences (see get_prev_positions, which sorts the tokens),
+    the counting is linear in the text length.
+    Instead of counting every window again, every token adds one type to all windows in which it is the first occurrence of its lemma
+    (the windows that start after the previous occurrence), which is the same as adding the entering and removing the leaving token of each window.
+
+        Input:
+            1. ids (numpy.ndarray): Lemma id of every token
+            2. window (int): Window size in tokens. The default value is 500
+            3. prev (numpy.ndarray): Result of get_prev_positions(ids), calculated if not given
+        Output:
+            1. types (numpy.ndarray): Number of word types in each of the len(ids) - window + 1 windows (empty if the text is shorter than the window)"""
+
+    n_windows = len(ids) - window + 1
+
+    if n_windows <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if prev is None:
+        prev = get_prev_positions(ids)
+
+    pos = np.arange(len(ids))
+    # first and last window start in which the token is the first occurrence of its lemma
+    first = np.maximum(prev + 1, pos - window + 1)
+    last = np.minimum(pos, n_windows - 1)
+    valid = first <= last
+
+    # difference array: +1 at the first window, -1 after the last window
+    diff = np.bincount(first[valid], minlength=n_windows + 1) - np.bincount(last[valid] + 1, minlength=n_windows + 1)
+    types = np.cumsum(diff[:n_windows])
+
+    return types
+
+
+######################################
+def compute_MATTR(lemma_list, window=500):
+    """
+    Function that computes the MATTR value (moving-average type-token ratio, Covington and McFall 2010) of a text:
+    the mean type-token ratio of all windows of window tokens. Same result as compute_MATTR in 1_lexical_diversity.ipynb for window = 500.
+
+        Input:
+            1. lemma_list (list or numpy.ndarray): Lemmas of a text (str) or lemma ids (see intern_lemmas)
+            2. window (int): Window size in tokens. The default value is 500
+        Output:
+            1. MATTR_val (float): MATTR value, NaN if the text is shorter than the window"""
+
+    MATTR_val = compute_MATTR_windows(lemma_list, (window,))[window]
+
+    return MATTR_val
+
+
+######################################
+def compute_MATTR_windows(lemma_list, windows=(500,)):
+    """
+    Function that computes the MATTR values of a text for several window sizes (e.g. for sensitivity analyses).
+    Lemma ids and previous occurrences are only calculated once for all window sizes.
+
+        Input:
+            1. lemma_list (list or numpy.ndarray): Lemmas of a text (str) or lemma ids (see intern_lemmas)
+            2. windows (tuple): Window sizes in tokens. The default value is (500,)
+        Output:
+            1. MATTR_vals (dict): Dictionary with key = window size (int) and value = MATTR value (float)"""
+
+    ids = lemma_list if isinstance(lemma_list, np.ndarray) else intern_lemmas(lemma_list)[0]
+    prev = get_prev_positions(ids)
+
+    MATTR_vals = dict()
+
+    for window in windows:
+        types = get_window_types(ids, window, prev)
+        MATTR_vals[window] = types.sum() / (len(types) * window) if len(types) else np.nan
+
+    return MATTR_vals
+
+
+######################################
+def batch_MATTR(lemma_lists, windows=(500,), workers=1):
+    """
+    Function that computes the MATTR values of many texts for one or more window sizes, optionally in a pool of worker processes.
+
+        Input:
+            1. lemma_lists (list): Lemma lists of the texts (list of str)
+            2. windows (tuple): Window sizes in tokens. The default value is (500,)
+            3. workers (int): Number of worker processes. The default value is 1 (no worker processes)
+        Output:
+            1. df_MATTR (Pandas.DataFrame): One row per text (in the order of lemma_lists) and one column per window size"""
+
+    lemma_lists = list(lemma_lists)
+
+    if workers <= 1:
+        results = [compute_MATTR_windows(lemma_list, windows) for lemma_list in lemma_lists]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(compute_MATTR_windows, lemma_lists, [windows]*len(lemma_lists), chunksize=8))
+
+    df_MATTR = pd.DataFrame(results, columns=list(windows))
+
+    return df_MATTR
+
+
+######################################
+def get_p_zero(N: int, freqs: np.ndarray, sample=42):
+    """
+    Function that computes for lemma frequencies the probability that a lemma does not occur in a random sample of sample tokens
+    drawn without replacement from a text of N tokens (hypergeometric distribution, same as scipy.stats.hypergeom(N, freq, sample).pmf(0)).
+    P(0) = C(N - freq, sample) / C(N, sample) is calculated with log-gamma functions for all frequencies at once; results are cached in P_ZERO_CACHE.
+
+        Input:
+            1. N (int): Number of tokens of the text
+            2. freqs (numpy.ndarray): Lemma frequencies
+            3. sample (int): Sample size in tokens. The default value is 42
+        Output:
+            1. p_zero (numpy.ndarray): Probability of non-occurrence for every frequency"""
+
+    freqs = np.asarray(freqs, dtype=np.int64)
+    missing = np.array([f for f in freqs.tolist() if (N, f, sample) not in P_ZERO_CACHE], dtype=np.int64)
+
+    if len(missing):
+        rest = N - missing
+        # the lemma occurs in every sample if fewer than sample tokens are other lemmas
+        log_p = gammaln(rest + 1) + gammaln(N - sample + 1) - gammaln(N + 1) - gammaln(np.maximum(rest - sample, 0) + 1)
+        p_missing = np.where(rest >= sample, np.exp(log_p), 0.0)
+        P_ZERO_CACHE.update(zip(((N, f, sample) for f in missing.tolist()), p_missing.tolist()))
+
+    p_zero = np.array([P_ZERO_CACHE[(N, f, sample)] for f in freqs.tolist()])
+
+    return p_zero
+
+
+######################################
+def compute_HDD_from_freqs(freqs: np.ndarray, sample=42):
+    """
+    Function that computes the HD-D value from the frequencies of the lemma types of a text.
+    Lemma types with the same frequency have the same probability, so it is calculated once per frequency (frequency of frequencies).
+
+        Input:
+            1. freqs (numpy.ndarray): Frequency of every lemma type of the text
+            2. sample (int): Sample size in tokens. The default value is 42
+        Output:
+            1. HDD_val (float): HD-D value, NaN if the text is shorter than the sample"""
+
+    N = int(np.sum(freqs))
+
+    # probability of non-occurrence is not defined for samples larger than the text
+    if N < sample:
+        return np.nan
+
+    # frequency of frequencies: how many lemma types occur f times
+    freq_values, type_counts = np.unique(freqs, return_counts=True)
+    p_zero = get_p_zero(N, freq_values, sample)
+
+    # sum of the probabilities of occurrence in a sample, divided by the sample size
+    HDD_val = np.sum(type_counts * (1 - p_zero)) / sample
+
+    return HDD_val
+
+
+######################################
+def compute_HDD(lemma_list, sample=42):
+    """
+    Function that computes the HD-D value (McCarthy and Jarvis 2007) of a text: the sum over all lemma types of the probability
+    that the lemma occurs in a random sample of sample tokens, divided by the sample size. Same result as compute_HDD in 1_lexical_diversity.ipynb for sample = 42.
+
+        Input:
+            1. lemma_list (list or numpy.ndarray): Lemmas of a text (str) or lemma ids (see intern_lemmas)
+            2. sample (int): Sample size in tokens. The default value is 42
+        Output:
+            1. HDD_val (float): HD-D value, NaN if the text is shorter than the sample"""
+
+    ids = lemma_list if isinstance(lemma_list, np.ndarray) else intern_lemmas(lemma_list)[0]
+    freqs = np.bincount(ids)
+
+    HDD_val = compute_HDD_from_freqs(freqs[freqs > 0], sample)
+
+    return HDD_val
+
+
+######################################
+def compute_HDD_samples(lemma_list, samples=(42,)):
+    """
+    Function that computes the HD-D values of a text for several sample sizes (e.g. for sensitivity analyses).
+
+        Input:
+            1. lemma_list (list or numpy.ndarray): Lemmas of a text (str) or lemma ids (see intern_lemmas)
+            2. samples (tuple): Sample sizes in tokens. The default value is (42,)
+        Output:
+            1. HDD_vals (dict): Dictionary with key = sample size (int) and value = HD-D value (float)"""
+
+    ids = lemma_list if isinstance(lemma_list, np.ndarray) else intern_lemmas(lemma_list)[0]
+    freqs = np.bincount(ids)
+    freqs = freqs[freqs > 0]
+
+    HDD_vals = {sample: compute_HDD_from_freqs(freqs, sample) for sample in samples}
+
+    return HDD_vals
+
+
+######################################
+def batch_HDD(lemma_lists, samples=(42,), workers=1):
+    """
+    Function that computes the HD-D values of many texts for one or more sample sizes, optionally in a pool of worker processes.
+
+        Input:
+            1. lemma_lists (list): Lemma lists of the texts (list of str)
+            2. samples (tuple): Sample sizes in tokens. The default value is (42,)
+            3. workers (int): Number of worker processes. The default value is 1 (no worker processes)
+        Output:
+            1. df_HDD (Pandas.DataFrame): One row per text (in the order of lemma_lists) and one column per sample size"""
+
+    lemma_lists = list(lemma_lists)
+
+    if workers <= 1:
+        results = [compute_HDD_samples(lemma_list, samples) for lemma_list in lemma_lists]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(compute_HDD_samples, lemma_lists, [samples]*len(lemma_lists), chunksize=8))
+
+    df_HDD = pd.DataFrame(results, columns=list(samples))
+
+    return df_HDD
+
+
+######################################
+def get_MTLD_factors(prev: np.ndarray, threshold=0.72):
+    """
+    Function that counts the MTLD factors of a text (segments that end at the first token where the TTR of the segment drops below the threshold).
+    A token is a new word type of the current segment if the previous occurrence of its lemma is before the start of the segment,
+    so no dictionary of word types has to be rebuilt for every segment.
+
+        Input:
+            1. prev (numpy.ndarray): Position of the previous occurrence of the lemma of every token (see get_prev_positions)
+            2. threshold (float): TTR threshold for the end of a segment. The default value is 0.72
+        Output:
+            1. factor_count (int): Number of complete segments
+            2. rest_TTR (float): TTR of the tokens after the last complete segment, None if there are none"""
+
+    factor_count = 0
+    start = 0
+    types = 0
+    TTR_value = None
+
+    for pos, prev_pos in enumerate(prev.tolist()):
+        if prev_pos < start:
+            types += 1
+        TTR_value = types / (pos - start + 1)
+
+        # end of a segment at first TTR < threshold, reset all counters
+        if TTR_value < threshold:
+            factor_count += 1
+            start = pos + 1
+            types = 0
+            TTR_value = None
+
+    return factor_count, TTR_value
+
+
+######################################
+def get_MTLD_value(prev: np.ndarray, threshold=0.72):
+    """
+    Function that computes the MTLD value of one direction of a text: number of tokens divided by the number of factors including the partial factor of the remaining tokens
+    (compute_MTLD, partial_MTLD in 1_lexical_diversity.ipynb).
+
+        Input:
+            1. prev (numpy.ndarray): Position of the previous occurrence of the lemma of every token (see get_prev_positions)
+            2. threshold (float): TTR threshold for the end of a segment. The default value is 0.72
+        Output:
+            1. MTLD_value (float): Mean segment length, NaN if there is no factor (e.g. no lemma occurs twice)"""
+
+    factor_count, rest_TTR = get_MTLD_factors(prev, threshold)
+
+    # partial factor for the remaining tokens
+    factors = factor_count + ((1 - rest_TTR) / (1 - threshold) if rest_TTR is not None else 0)
+
+    MTLD_value = len(prev) / factors if factors else np.nan
+
+    return MTLD_value
+
+
+######################################
+def get_MSTTR(ids: np.ndarray, prev: np.ndarray, segment=100):
+    """
+    Function that computes the MSTTR value (mean TTR of consecutive segments of segment tokens, remaining tokens are discarded).
+
+        Input:
+            1. ids (numpy.ndarray): Lemma id of every token
+            2. prev (numpy.ndarray): Position of the previous occurrence of the lemma of every token (see get_prev_positions)
+            3. segment (int): Segment size in tokens. The default value is 100
+        Output:
+            1. MSTTR_val (float): MSTTR value, NaN if the text is shorter than one segment"""
+
+    n_segments = len(ids) // segment
+
+    if n_segments == 0:
+        return np.nan
+
+    pos = np.arange(n_segments * segment)
+    # a token is a new word type of its segment if its lemma did not occur before in the segment
+    new = prev[:len(pos)] < (pos // segment) * segment
+    types = np.bincount(pos // segment, weights=new, minlength=n_segments)
+
+    MSTTR_val = np.mean(types / segment)
+
+    return MSTTR_val
+
+
+######################################
+def compute_lex_diversity(lemma_list, window=500, sample=42, segment=100, threshold=0.72):
+    """
+    Function that computes all lexical diversity measures of a text from the same lemma ids, previous occurrences and lemma frequencies
+    (instead of walking through the lemma list with a new dictionary for every measure).
+
+    MTLD is calculated like in 1_lexical_diversity.ipynb as MTLD_FORWARD + MTLD_REVERSE / 2, so that results stay comparable with results/1_lex/;
+    the values of both directions are returned as well.
+
+        Input:
+            1. lemma_list (list or numpy.ndarray): Lemmas of a text (str) or lemma ids (see intern_lemmas)
+            2. window (int): Window size of MATTR in tokens. The default value is 500
+            3. sample (int): Sample size of HD-D in tokens. The default value is 42
+            4. segment (int): Segment size of MSTTR in tokens. The default value is 100
+            5. threshold (float): TTR threshold of MTLD. The default value is 0.72
+        Output:
+            1. lex_vals (dict): Dictionary with key = measure name ("MTLD", "MSTTR", "HD-D", "MATTR", "MTLD_FORWARD", "MTLD_REVERSE") and value = measure value (float)"""
+
+    ids = lemma_list if isinstance(lemma_list, np.ndarray) else intern_lemmas(lemma_list)[0]
+    prev = get_prev_positions(ids)
+    # previous occurrences of the reversed text for the reverse run of MTLD
+    prev_reverse = get_prev_positions(ids[::-1])
+
+    freqs = np.bincount(ids)
+    types = get_window_types(ids, window, prev)
+
+    lex_vals = dict()
+    lex_vals["MTLD_FORWARD"] = get_MTLD_value(prev, threshold)
+    lex_vals["MTLD_REVERSE"] = get_MTLD_value(prev_reverse, threshold)
+    lex_vals["MTLD"] = lex_vals["MTLD_FORWARD"] + lex_vals["MTLD_REVERSE"] / 2
+    lex_vals["MSTTR"] = get_MSTTR(ids, prev, segment)
+    lex_vals["HD-D"] = compute_HDD_from_freqs(freqs[freqs > 0], sample)
+    lex_vals["MATTR"] = types.sum() / (len(types) * window) if len(types) else np.nan
+
+    return lex_vals
+
+
+######################################
+def batch_lex_diversity(lemma_lists, workers=1, **options):
+    """
+    Function that computes all lexical diversity measures of many texts, optionally in a pool of worker processes.
+
+        Input:
+            1. lemma_lists (list): Lemma lists of the texts (list of str)
+            2. workers (int): Number of worker processes. The default value is 1 (no worker processes)
+            3. options: Keyword arguments of compute_lex_diversity (window, sample, segment, threshold)
+        Output:
+            1. df_lex (Pandas.DataFrame): One row per text (in the order of lemma_lists) and one column per measure"""
+
+    lemma_lists = list(lemma_lists)
+    options_list = [options]*len(lemma_lists)
+
+    if workers <= 1:
+        results = [compute_lex_diversity(lemma_list, **options) for lemma_list in lemma_lists]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(call_lex_diversity, lemma_lists, options_list, chunksize=8))
+
+    df_lex = pd.DataFrame(results, columns=MEASURE_NAMES + ["MTLD_FORWARD", "MTLD_REVERSE"])
+
+    return df_lex
+
+
+def call_lex_diversity(lemma_list, options: dict):
+    """
+    Function that calls compute_lex_diversity with keyword arguments from a dictionary (for ProcessPoolExecutor.map).
+
+        Input:
+            1. lemma_list (list): Lemmas of a text (str)
+            2. options (dict): Keyword arguments of compute_lex_diversity
+        Output:
+            1. lex_vals (dict): See compute_lex_diversity"""
+
+    return compute_lex_diversity(lemma_list, **options)
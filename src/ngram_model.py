@@ -0,0 +1,655 @@
+# POS n-gram models for the perplexity experiment (see 2_perplexity.ipynb)
+# tagged files (*.spl, one sentence of POS tags per line) are read sentence by sentence, POS tags are replaced by ids from a small vocabulary
+# and unigram and bigram counts are stored in dense NumPy arrays (about 55 STTS tags plus sentence boundaries)
+# KneserNeyModel: higher-order models with interpolated Kneser-Ney smoothing, saved as .npy files and memory-mapped when loaded
+
+# import modules
+import os
+import json
+from itertools import islice
+import numpy as np
+
+# sentence boundary symbols (padding as in create_model in 2_perplexity.ipynb)
+BOS, EOS = "<s>", "</s>"
+
+
+class TagVocab:
+    """
+    A class to represent the vocabulary of POS tags. "<s>" and "</s>" always have the ids 0 and 1.
+
+    Attributes
+    ----------
+    tags : list
+        POS tags (str), the position in the list is the tag id
+    tag_ids : dict
+        Dictionary with key = POS tag (str) and value = tag id (int)
+
+    Methods
+    -------
+    encode(tags: list, add: bool):
+        Returns the ids of POS tags.
+    """
+    def __init__(self, tags=()):
+        self.tags = list()
+        self.tag_ids = dict()
+
+        for tag in [BOS, EOS] + list(tags):
+            self.add_tag(tag)
+
+    def __len__(self):
+        return len(self.tags)
+
+    def add_tag(self, tag: str):
+        """
+        Adds a POS tag to the vocabulary if it is unknown and returns its id.
+
+        Input:
+            1. tag (str): POS tag
+        Output:
+            1. tag_id (int): Id of the POS tag"""
+
+        if tag not in self.tag_ids:
+            self.tag_ids[tag] = len(self.tags)
+            self.tags.append(tag)
+
+        return self.tag_ids[tag]
+
+    def encode(self, tags: list, add=True):
+        """
+        Returns the ids of a list of POS tags as array.
+
+        Input:
+            1. tags (list): POS tags (str)
+            2. add (bool): True when unknown POS tags should be added to the vocabulary, otherwise they get the id -1
+        Output:
+            1. ids (numpy.ndarray): Ids of the POS tags (int64)"""
+
+        if add:
+            for tag in set(tags).difference(self.tag_ids):
+                self.add_tag(tag)
+
+        ids = np.fromiter((self.tag_ids.get(tag, -1) for tag in tags), dtype=np.int64, count=len(tags))
+
+        return ids
+
+
+######################################
+def iter_sentences(filepaths: list):
+    """
+    Generator that reads tagged files line by line and returns the POS tags of every sentence (empty lines are skipped).
+
+        Input:
+            1. filepaths (list): Paths to tagged files with one sentence of POS tags separated by spaces per line
+        Output:
+            1. tags (list): POS tags of a sentence (str)"""
+
+    for filepath in filepaths:
+        with open(filepath, mode="r", encoding="UTF-8") as infile:
+            for line in infile:
+                tags = line.split()
+                if tags:
+                    yield tags
+
+
+######################################
+def get_filepaths(directory: str):
+    """
+    Function that returns the paths of all files in a directory (sorted, so models do not depend on the order of os.listdir).
+
+        Input:
+            1. directory (str): Path to the directory, e.g. "data_tmp/perplex/tagged/zeit/"
+        Output:
+            1. filepaths (list): Paths to the files (str)"""
+
+    filepaths = [os.path.join(directory, filename) for filename in sorted(os.listdir(directory))
+                 if os.path.isfile(os.path.join(directory, filename))]
+
+    return filepaths
+
+
+######################################
+def pad_sentences(sentences, vocab: TagVocab, add=True):
+    """
+    Function that encodes sentences as one array of tag ids with "<s>" and "</s>" around every sentence.
+
+        Input:
+            1. sentences (iterable): POS tags of every sentence (list of str)
+            2. vocab (TagVocab): Vocabulary of the POS tags
+            3. add (bool): True when unknown POS tags should be added to the vocabulary, otherwise they get the id -1
+        Output:
+            1. ids (numpy.ndarray): Tag ids of the padded text (int64)"""
+
+    padded = list()
+    for tags in sentences:
+        padded.append(BOS)
+        padded.extend(tags)
+        padded.append(EOS)
+
+    return vocab.encode(padded, add=add)
+
+
+class BigramModel:
+    """
+    A class to represent a POS bigram model with unigram and bigram counts in dense arrays.
+
+    Attributes
+    ----------
+    vocab : TagVocab
+        Vocabulary of the POS tags
+    unigrams : numpy.ndarray
+        Frequency of every tag id, including "<s>" and "</s>" (int64)
+    bigrams : numpy.ndarray
+        Frequency of every bigram, bigrams[first id, second id] (int64), without the bigram ("</s>", "<s>") between sentences
+    word_count : int
+        Number of tokens without "<s>" (count_words in 2_perplexity.ipynb)
+
+    Methods
+    -------
+    from_files(filepaths: list, vocab: TagVocab, chunk_size: int):
+        Builds a model from tagged files, reading chunks of sentences.
+    add_sentences(sentences: iterable):
+        Adds the counts of sentences to the model.
+    perplexity(ids: numpy.ndarray, max_types: int):
+        Calculates the perplexity of the model for a padded test text.
+    """
+    def __init__(self, vocab=None):
+        self.vocab = TagVocab() if vocab is None else vocab
+        self.unigrams = np.zeros(len(self.vocab), dtype=np.int64)
+        self.bigrams = np.zeros((len(self.vocab), len(self.vocab)), dtype=np.int64)
+        self.word_count = 0
+
+    @classmethod
+    def from_files(cls, filepaths: list, vocab=None, chunk_size=10000):
+        """
+        Builds a model from tagged files. Sentences are read and counted in chunks, so memory only depends on the chunk size and the number of POS tags.
+
+        Input:
+            1. filepaths (list): Paths to tagged files (str), or path to a directory with tagged files
+            2. vocab (TagVocab): Vocabulary of the POS tags, a new vocabulary if not given
+            3. chunk_size (int): Number of sentences that are counted at once. The default value is 10000
+        Output:
+            1. model (BigramModel): Bigram model"""
+
+        if isinstance(filepaths, str):
+            filepaths = get_filepaths(filepaths)
+
+        model = cls(vocab)
+        sentences = iter_sentences(filepaths)
+
+        # bigrams do not cross sentence boundaries, so chunks can be counted independently
+        while True:
+            chunk = list(islice(sentences, chunk_size))
+            if not chunk:
+                break
+            model.add_sentences(chunk)
+
+        return model
+
+    def resize(self):
+        """
+        Enlarges the count arrays when POS tags have been added to the vocabulary."""
+
+        size = len(self.vocab)
+        if size > len(self.unigrams):
+            grow = size - len(self.unigrams)
+            self.unigrams = np.pad(self.unigrams, (0, grow))
+            self.bigrams = np.pad(self.bigrams, ((0, grow), (0, grow)))
+
+    def add_sentences(self, sentences):
+        """
+        Adds the unigram and bigram counts of sentences to the model.
+
+        Input:
+            1. sentences (iterable): POS tags of every sentence (list of str)"""
+
+        ids = pad_sentences(sentences, self.vocab)
+        self.resize()
+
+        size = len(self.vocab)
+        self.unigrams += np.bincount(ids, minlength=size)
+
+        # bigrams of neighbouring ids, without ("</s>", "<s>") between two sentences
+        first, second = ids[:-1], ids[1:]
+        keep = first != self.vocab.tag_ids[EOS]
+        self.bigrams += np.bincount(first[keep]*size + second[keep], minlength=size*size).reshape(size, size)
+
+        self.word_count += len(ids) - np.count_nonzero(ids == self.vocab.tag_ids[BOS])
+
+    def get_log_probs(self, size=None):
+        """
+        Returns the log probabilities log P(second | first) = log(bigram count / unigram count of first) of all bigrams as matrix.
+        Bigrams that do not occur in the model get 0, so they are skipped when scoring (as in 2_perplexity.ipynb).
+
+        Input:
+            1. size (int): Number of tag ids of the matrix, e.g. the size of a vocabulary that has grown after training. The default value is the size of the model
+        Output:
+            1. log_probs (numpy.ndarray): Matrix of the shape (size, size), log_probs[first id, second id]"""
+
+        size = len(self.unigrams) if size is None else size
+        n = len(self.unigrams)
+
+        log_probs = np.zeros((size, size))
+        seen = self.bigrams > 0
+        log_probs[:n, :n][seen] = np.log(self.bigrams[seen] / np.broadcast_to(self.unigrams[:, None], (n, n))[seen])
+
+        return log_probs
+
+    def perplexity(self, ids: np.ndarray, max_types=None):
+        """
+        Calculates the perplexity of the model for a padded test text as in 2_perplexity.ipynb:
+        exp(-(sum of frequency * log P(second | first) of the test bigram types) / number of test words).
+        Bigram types that do not occur in the model are skipped.
+
+        Input:
+            1. ids (numpy.ndarray): Tag ids of the padded test text (see pad_sentences, add=False)
+            2. max_types (int): Only the first max_types bigram types of the test text are used. The default value is None (all bigram types)
+        Output:
+            1. perpl (float): Perplexity"""
+
+        counts, word_counts = encode_bigram_counts([ids], self.vocab, max_types)
+        perpl = batch_perplexity(counts, word_counts, stack_log_probs([self], self.vocab))[0, 0]
+
+        return perpl
+
+
+######################################
+def get_bigram_types(ids: np.ndarray, vocab: TagVocab, max_types=None):
+    """
+    Function that returns the bigram types of a padded test text with their frequencies, in the order of their first occurrence (as in a dictionary of bigrams).
+
+        Input:
+            1. ids (numpy.ndarray): Tag ids of the padded test text (unknown tags have the id -1)
+            2. vocab (TagVocab): Vocabulary of the POS tags
+            3. max_types (int): Only the first max_types bigram types are returned. The default value is None (all bigram types)
+        Output:
+            1. first (numpy.ndarray): Id of the first tag of every bigram type (-1 for unknown tags)
+            2. second (numpy.ndarray): Id of the second tag of every bigram type (-1 for unknown tags)
+            3. counts (numpy.ndarray): Frequency of every bigram type"""
+
+    # shift ids so that unknown tags (-1) get their own code
+    size = len(vocab) + 1
+    first, second = ids[:-1] + 1, ids[1:] + 1
+    keep = first != vocab.tag_ids[EOS] + 1
+    codes = first[keep]*size + second[keep]
+
+    types, first_pos, counts = np.unique(codes, return_index=True, return_counts=True)
+    order = np.argsort(first_pos, kind="stable")[:max_types]
+
+    return types[order] // size - 1, types[order] % size - 1, counts[order]
+
+
+######################################
+def encode_bigram_counts(texts: list, vocab: TagVocab, max_types=None):
+    """
+    Function that encodes test texts as matrix of bigram counts (one row per text, one column per bigram of tag ids) and counts their words.
+
+        Input:
+            1. texts (list): Tag ids of the padded test texts (see pad_sentences, add=False)
+            2. vocab (TagVocab): Vocabulary of the POS tags
+            3. max_types (int or list): Only the first max_types bigram types of a text are used, one value for all texts or one value per text.
+                                        The default value is None (all bigram types)
+        Output:
+            1. counts (numpy.ndarray): Matrix of the shape (number of texts, size * size) with size = len(vocab)
+            2. word_counts (numpy.ndarray): Number of words of every text (without "<s>")"""
+
+    size = len(vocab)
+    if not isinstance(max_types, (list, tuple, np.ndarray)):
+        max_types = [max_types]*len(texts)
+
+    counts = np.zeros((len(texts), size*size))
+    word_counts = np.zeros(len(texts))
+
+    for row, (ids, text_max_types) in enumerate(zip(texts, max_types)):
+        first, second, type_counts = get_bigram_types(ids, vocab, text_max_types)
+        # bigrams with unknown tags do not occur in any model
+        known = (first >= 0) & (second >= 0)
+        counts[row, first[known]*size + second[known]] = type_counts[known]
+        word_counts[row] = len(ids) - np.count_nonzero(ids == vocab.tag_ids[BOS])
+
+    return counts, word_counts
+
+
+######################################
+def stack_log_probs(models: list, vocab: TagVocab):
+    """
+    Function that stacks the log probabilities of several models with the same vocabulary (one row per model).
+
+        Input:
+            1. models (list): Models (BigramModel) built with vocab
+            2. vocab (TagVocab): Vocabulary of the POS tags
+        Output:
+            1. log_probs (numpy.ndarray): Matrix of the shape (number of models, size * size) with size = len(vocab)"""
+
+    size = len(vocab)
+    log_probs = np.stack([model.get_log_probs(size).ravel() for model in models])
+
+    return log_probs
+
+
+######################################
+def batch_perplexity(counts: np.ndarray, word_counts: np.ndarray, log_probs: np.ndarray):
+    """
+    Function that calculates the perplexities of all test texts for all models with one matrix multiplication.
+
+        Input:
+            1. counts (numpy.ndarray): Bigram counts of the test texts (see encode_bigram_counts)
+            2. word_counts (numpy.ndarray): Number of words of the test texts (see encode_bigram_counts)
+            3. log_probs (numpy.ndarray): Log probabilities of the models (see stack_log_probs)
+        Output:
+            1. perpl (numpy.ndarray): Matrix of the shape (number of texts, number of models)"""
+
+    perpl = np.exp(-(counts @ log_probs.T) / word_counts[:, None])
+
+    return perpl
+
+
+######################################
+def get_signature(filepaths: list):
+    """
+    Function that returns name, size and modification time of files, to check whether a saved model was trained on the current files.
+
+        Input:
+            1. filepaths (list): Paths to files (str)
+        Output:
+            1. signature (list): One list [path, size, modification time] per file"""
+
+    return [[filepath, os.path.getsize(filepath), os.path.getmtime(filepath)] for filepath in filepaths]
+
+
+class KneserNeyModel:
+    """
+    A class to represent a POS n-gram model of any order with interpolated Kneser-Ney smoothing.
+    N-grams are stored as sorted integer codes (tag ids as digits of a number with base base) with their counts: raw counts for the highest order,
+    continuation counts (number of different tags before the n-gram) for the lower orders. The arrays can be saved as .npy files and memory-mapped.
+
+    Attributes
+    ----------
+    order : int
+        Order of the model, e.g. 3 for trigrams
+    vocab : TagVocab
+        Vocabulary of the POS tags
+    base : int
+        Base of the n-gram codes, the id base - 1 is used for unknown tags
+    codes : list
+        Sorted n-gram codes of every order (numpy.ndarray), codes[k-1] for order k
+    counts : list
+        Counts of the n-grams of every order (numpy.ndarray)
+    hist_codes : list
+        Sorted codes of the histories (n-grams without the last tag) of every order
+    hist_totals : list
+        Sum of the counts of all n-grams with the history
+    hist_types : list
+        Number of different n-grams with the history
+    discounts : list
+        Discount of every order (float)
+    signature : list
+        Training files with size and modification time (see get_signature)
+
+    Methods
+    -------
+    from_files(filepaths: list, order: int):
+        Trains a model on tagged files.
+    log_probs(ids: numpy.ndarray):
+        Returns the log probability of every tag of a padded test text.
+    perplexity(sentences: iterable):
+        Calculates the perplexity of the model for a test text.
+    save(directory: str):
+        Saves the model as .npy files and a JSON file.
+    load(directory: str, mmap: bool):
+        Loads a saved model, memory-mapping the arrays.
+    """
+    def __init__(self, order=3, vocab=None, base=256):
+        self.order = order
+        self.vocab = TagVocab() if vocab is None else vocab
+        self.base = base
+        self.codes = list()
+        self.counts = list()
+        self.hist_codes = list()
+        self.hist_totals = list()
+        self.hist_types = list()
+        self.discounts = list()
+        self.signature = list()
+
+    def pad(self, sentences, add=False):
+        """
+        Encodes sentences as one array of tag ids with order - 1 "<s>" before and "</s>" after every sentence. Unknown tags get the id base - 1.
+
+        Input:
+            1. sentences (iterable): POS tags of every sentence (list of str)
+            2. add (bool): True when unknown POS tags should be added to the vocabulary (training)
+        Output:
+            1. ids (numpy.ndarray): Tag ids of the padded text (int64)"""
+
+        padded = list()
+        for tags in sentences:
+            padded.extend([BOS]*(self.order - 1))
+            padded.extend(tags)
+            padded.append(EOS)
+
+        ids = self.vocab.encode(padded, add=add)
+
+        if len(self.vocab) >= self.base:
+            raise ValueError("too many POS tags for base %d" % self.base)
+
+        # unknown tags and tags added to the vocabulary after training
+        ids[(ids < 0) | (ids >= len(self.vocab))] = self.base - 1
+
+        return ids
+
+    def get_ngram_codes(self, ids: np.ndarray, order=None):
+        """
+        Returns the codes of the n-grams that end in every tag of a padded text except "<s>" (the tags that are predicted).
+
+        Input:
+            1. ids (numpy.ndarray): Tag ids of the padded text (see pad)
+            2. order (int): Order of the n-grams. The default value is the order of the model
+        Output:
+            1. codes (numpy.ndarray): N-gram codes (int64)"""
+
+        order = self.order if order is None else order
+        targets = np.flatnonzero(ids != self.vocab.tag_ids[BOS])
+
+        # every sentence starts with order - 1 "<s>", so the n-grams never cross sentence boundaries
+        codes = np.zeros(len(targets), dtype=np.int64)
+        for offset in range(order - 1, -1, -1):
+            codes = codes*self.base + ids[targets - offset]
+
+        return codes
+
+    @classmethod
+    def from_files(cls, filepaths: list, order=3, vocab=None, chunk_size=10000):
+        """
+        Trains a model on tagged files. Sentences are counted in chunks, so memory only depends on the chunk size and the number of different n-grams.
+
+        Input:
+            1. filepaths (list): Paths to tagged files (str), or path to a directory with tagged files
+            2. order (int): Order of the model. The default value is 3
+            3. vocab (TagVocab): Vocabulary of the POS tags, a new vocabulary if not given
+            4. chunk_size (int): Number of sentences that are counted at once. The default value is 10000
+        Output:
+            1. model (KneserNeyModel): Trained model"""
+
+        if isinstance(filepaths, str):
+            filepaths = get_filepaths(filepaths)
+
+        model = cls(order, vocab)
+        sentences = iter_sentences(filepaths)
+
+        codes = np.zeros(0, dtype=np.int64)
+        counts = np.zeros(0, dtype=np.int64)
+
+        while True:
+            chunk = list(islice(sentences, chunk_size))
+            if not chunk:
+                break
+            # merge the counts of the chunk with the counts so far
+            chunk_codes = model.get_ngram_codes(model.pad(chunk, add=True))
+            codes, inverse = np.unique(np.concatenate([codes, chunk_codes]), return_inverse=True)
+            counts = np.bincount(inverse, weights=np.concatenate([counts, np.ones(len(chunk_codes), dtype=np.int64)]), minlength=len(codes)).astype(np.int64)
+
+        model.set_counts(codes, counts)
+        model.signature = get_signature(filepaths)
+
+        return model
+
+    def set_counts(self, codes: np.ndarray, counts: np.ndarray):
+        """
+        Calculates continuation counts of the lower orders, history statistics and discounts from the counts of the highest order.
+
+        Input:
+            1. codes (numpy.ndarray): Sorted codes of the n-grams of the highest order
+            2. counts (numpy.ndarray): Counts of the n-grams"""
+
+        levels = [(codes, counts)]
+
+        for k in range(self.order - 1, 0, -1):
+            # continuation count of a (k)-gram = number of different (k+1)-grams that end with it
+            suffixes = levels[0][0] % self.base**k
+            lower_codes, lower_counts = np.unique(suffixes, return_counts=True)
+            levels.insert(0, (lower_codes, lower_counts.astype(np.int64)))
+
+        self.codes, self.counts = [level[0] for level in levels], [level[1] for level in levels]
+        self.hist_codes, self.hist_totals, self.hist_types, self.discounts = list(), list(), list(), list()
+
+        for level_codes, level_counts in levels:
+            hist_codes, inverse = np.unique(level_codes // self.base, return_inverse=True)
+            self.hist_codes.append(hist_codes)
+            self.hist_totals.append(np.bincount(inverse, weights=level_counts, minlength=len(hist_codes)))
+            self.hist_types.append(np.bincount(inverse, minlength=len(hist_codes)).astype(np.float64))
+
+            # discount D = n1 / (n1 + 2 * n2) from the number of n-grams that occur once and twice
+            n1, n2 = np.count_nonzero(level_counts == 1), np.count_nonzero(level_counts == 2)
+            self.discounts.append(n1 / (n1 + 2*n2) if n1 and n2 else 0.75)
+
+    @staticmethod
+    def lookup(keys: np.ndarray, values: np.ndarray, queries: np.ndarray):
+        """
+        Returns the values of the queries in sorted keys (0 for queries that are not in keys).
+
+        Input:
+            1. keys (numpy.ndarray): Sorted keys
+            2. values (numpy.ndarray): Values of the keys
+            3. queries (numpy.ndarray): Keys to look up
+        Output:
+            1. found (numpy.ndarray): Values of the queries (float64)"""
+
+        pos = np.searchsorted(keys, queries)
+        pos[pos == len(keys)] = 0
+        found = np.where(keys[pos] == queries, values[pos], 0).astype(np.float64) if len(keys) else np.zeros(len(queries))
+
+        return found
+
+    def log_probs(self, ids: np.ndarray):
+        """
+        Returns the interpolated Kneser-Ney log probability of every tag of a padded test text except "<s>":
+        P(w | h) = max(c(h w) - D, 0) / c(h) + D * N(h) / c(h) * P(w | shorter h), with N(h) = number of different tags after h.
+        The unigram probabilities are interpolated with a uniform distribution over all tags that can be predicted (the tags of the vocabulary without "<s>",
+        and unknown tags), so unknown tags get a probability above 0 and the probabilities of all tags after a history sum to 1.
+
+        Input:
+            1. ids (numpy.ndarray): Tag ids of the padded test text (see pad)
+        Output:
+            1. log_probs (numpy.ndarray): Natural log probabilities"""
+
+        codes = self.get_ngram_codes(ids)
+
+        # unigrams, history = empty
+        total, types, D = self.hist_totals[0][0], self.hist_types[0][0], self.discounts[0]
+        count = self.lookup(self.codes[0], self.counts[0], codes % self.base)
+        # uniform distribution: len(vocab) - 1 tags without "<s>" and the id for unknown tags
+        probs = np.maximum(count - D, 0) / total + D * types / total / len(self.vocab)
+
+        for k in range(2, self.order + 1):
+            kgram = codes % self.base**k
+            count = self.lookup(self.codes[k-1], self.counts[k-1], kgram)
+            total = self.lookup(self.hist_codes[k-1], self.hist_totals[k-1], kgram // self.base)
+            types = self.lookup(self.hist_codes[k-1], self.hist_types[k-1], kgram // self.base)
+            D = self.discounts[k-1]
+            # unknown histories back off to the lower order completely
+            seen = total > 0
+            probs = np.where(seen, (np.maximum(count - D, 0) + D * types * probs) / np.where(seen, total, 1), probs)
+
+        return np.log(probs)
+
+    def perplexity(self, sentences):
+        """
+        Calculates the perplexity of the model for a test text: exp(-(sum of the log probabilities of all tags and "</s>") / number of words without "<s>").
+
+        Input:
+            1. sentences (iterable): POS tags of every sentence of the test text (list of str), e.g. iter_sentences([filepath])
+        Output:
+            1. perpl (float): Perplexity"""
+
+        log_probs = self.log_probs(self.pad(sentences))
+        perpl = np.exp(-log_probs.sum() / len(log_probs))
+
+        return perpl
+
+    def save(self, directory: str):
+        """
+        Saves the arrays of the model as .npy files (which can be memory-mapped) and the other attributes as model.json in a directory.
+
+        Input:
+            1. directory (str): Path to the directory, e.g. "data_tmp/perplex/models/ZEIT_3gram/\""""
+
+        os.makedirs(directory, exist_ok=True)
+
+        for name in ["codes", "counts", "hist_codes", "hist_totals", "hist_types"]:
+            for k, array in enumerate(getattr(self, name)):
+                np.save(os.path.join(directory, "%s_%d.npy" % (name, k + 1)), array)
+
+        meta = {"order": self.order, "base": self.base, "tags": self.vocab.tags, "discounts": self.discounts, "signature": self.signature}
+        # write the meta data last, so that incomplete models are not loaded
+        with open(os.path.join(directory, "model.json.tmp"), "w", encoding="UTF-8") as outfile:
+            json.dump(meta, outfile)
+        os.replace(os.path.join(directory, "model.json.tmp"), os.path.join(directory, "model.json"))
+
+    @classmethod
+    def load(cls, directory: str, mmap=True):
+        """
+        Loads a saved model. The arrays are memory-mapped, so loading takes no time and only the parts that are used for scoring are read.
+
+        Input:
+            1. directory (str): Path to the directory of the saved model
+            2. mmap (bool): True when the arrays should be memory-mapped instead of read. The default value is True
+        Output:
+            1. model (KneserNeyModel): Saved model"""
+
+        with open(os.path.join(directory, "model.json"), "r", encoding="UTF-8") as infile:
+            meta = json.load(infile)
+
+        model = cls(meta["order"], TagVocab(meta["tags"][2:]), meta["base"])
+        model.discounts = meta["discounts"]
+        model.signature = meta["signature"]
+
+        for name in ["codes", "counts", "hist_codes", "hist_totals", "hist_types"]:
+            setattr(model, name, [np.load(os.path.join(directory, "%s_%d.npy" % (name, k + 1)), mmap_mode="r" if mmap else None)
+                                  for k in range(model.order)])
+
+        return model
+
+
+######################################
+def load_or_train(filepaths: list, directory: str, order=3):
+    """
+    Function that loads a saved Kneser-Ney model if it was trained on the current files with the same order, and trains and saves it otherwise.
+
+        Input:
+            1. filepaths (list): Paths to tagged training files (str), or path to a directory with tagged files
+            2. directory (str): Directory of the saved model, e.g. "data_tmp/perplex/models/ZEIT_3gram/"
+            3. order (int): Order of the model. The default value is 3
+        Output:
+            1. model (KneserNeyModel): Model"""
+
+    if isinstance(filepaths, str):
+        filepaths = get_filepaths(filepaths)
+
+    if os.path.exists(os.path.join(directory, "model.json")):
+        model = KneserNeyModel.load(directory)
+        if model.order == order and model.signature == get_signature(filepaths):
+            return model
+
+    model = KneserNeyModel.from_files(filepaths, order)
+    model.save(directory)
+
+    return model
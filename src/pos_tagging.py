@@ -0,0 +1,460 @@
+# POS tagging of the Abitur texts and newspaper articles for the perplexity experiment (tag_abitexts, tag_articles in 2_perplexity.ipynb)
+# the tagger and the tokenizers are loaded once per worker process; the texts are split into sentences, the sentences of all files
+# are tagged in batches in a process pool and the tags are written per file in the original order as soon as the file is tagged
+# files whose tagged output is newer than the input are skipped
+# the token files of the Abitur texts (data_tmp/perplex/tokens/) are written with one sentence per line directly from the conllup files (save_tokens)
+# the tagger is created by a factory function, so the pipeline can be tested with StubTagger instead of the SoMeWeTa model
+
+# usage (call from root dir):
+# python3 src/pos_tagging.py --extract data/ --splits src/demo_dataSplits.csv
+# python3 src/pos_tagging.py --abitexts data_tmp/perplex/tokens/ --model /tmp/german_newspaper_2020-05-28.model --workers 4
+# python3 src/pos_tagging.py --articles data/ zeit_1.spl zeit_2.spl zeit_3.spl --out data_tmp/perplex/tagged/zeit/ --model /tmp/german_newspaper_2020-05-28.model
+
+# import modules
+import os
+import re
+import sys
+import argparse
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from functions import get_filenames, iter_sentence_forms
+
+# tagger of the worker process (see init_worker)
+TAGGER = None
+
+
+class SoMeWeTaTagger:
+    """
+    A class to represent the tagging pipeline of 2_perplexity.ipynb: NLTK punkt sentence tokenizer (German), NLTK word tokenizer and SoMeWeTa tagger.
+    someweta and nltk are only imported when the tagger is created.
+
+    Attributes
+    ----------
+    tagger : someweta.ASPTagger
+        Tagger with the loaded model
+    sent_tokenizer : nltk.tokenize.PunktSentenceTokenizer
+        German sentence tokenizer
+
+    Methods
+    -------
+    split_text(text: str):
+        Splits a text into sentences and the sentences into tokens.
+    tag_sentences(sentences: list):
+        Returns the POS tags of every sentence.
+    """
+    def __init__(self, model: str):
+        import nltk.data
+        from nltk.tokenize import word_tokenize
+        from someweta import ASPTagger
+
+        self.tagger = ASPTagger()
+        self.tagger.load(model)
+        self.sent_tokenizer = nltk.data.load("tokenizers/punkt/german.pickle")
+        self.word_tokenize = word_tokenize
+
+    def split_text(self, text: str):
+        """
+        Splits a text into sentences (punkt) and the sentences into tokens (word_tokenize).
+
+        Input:
+            1. text (str): Text
+        Output:
+            1. sentences (list): Tokens of every sentence (list of str)"""
+
+        return [self.word_tokenize(sent) for sent in self.sent_tokenizer.tokenize(text)]
+
+    def tag_sentences(self, sentences: list):
+        """
+        Tags a batch of sentences.
+
+        Input:
+            1. sentences (list): Tokens of every sentence (list of str)
+        Output:
+            1. tags (list): POS tags of every sentence (list of str)"""
+
+        return [[tag for _, tag in self.tagger.tag_sentence(sentence)] for sentence in sentences]
+
+
+class StubTagger:
+    """
+    A class to represent a tagger without model for tests: sentences end after ".", "!" or "?", tokens are separated by whitespace,
+    and every token gets the tag of its first matching rule (default "NN").
+
+    Attributes
+    ----------
+    rules : list
+        Tuples (regular expression, tag)
+
+    Methods
+    -------
+    split_text(text: str):
+        Splits a text into sentences and the sentences into tokens.
+    tag_sentences(sentences: list):
+        Returns the POS tags of every sentence.
+    """
+    def __init__(self, rules=((r"[.!?]$", "$."), (r"[,;:]$", "$,"), (r"[A-ZÄÖÜ]", "NN"), (r".", "XY"))):
+        self.rules = [(re.compile(regex), tag) for regex, tag in rules]
+
+    def split_text(self, text: str):
+        """
+        Splits a text into sentences (after ".", "!" or "?") and the sentences into tokens (at whitespace).
+
+        Input:
+            1. text (str): Text
+        Output:
+            1. sentences (list): Tokens of every sentence (list of str)"""
+
+        return [sent.split() for sent in re.split(r"(?<=[.!?])\s+", text) if sent.strip()]
+
+    def tag_sentences(self, sentences: list):
+        """
+        Tags a batch of sentences.
+
+        Input:
+            1. sentences (list): Tokens of every sentence (list of str)
+        Output:
+            1. tags (list): POS tags of every sentence (list of str)"""
+
+        return [[next((tag for regex, tag in self.rules if regex.match(tok)), "NN") for tok in sentence] for sentence in sentences]
+
+
+######################################
+def init_worker(factory, args: tuple):
+    """
+    Function that creates the tagger of a worker process once (initializer of the process pool).
+
+        Input:
+            1. factory (class or function): Creates the tagger, e.g. SoMeWeTaTagger or StubTagger
+            2. args (tuple): Arguments of the factory, e.g. the path to the SoMeWeTa model"""
+
+    global TAGGER
+    TAGGER = factory(*args)
+
+
+######################################
+def extract_tokens(filepath: str, outpath: str):
+    """
+    Function that writes the word forms of a conllup file (without headlines) with one sentence per line, tokens separated by spaces (see functions.iter_sentence_forms).
+    The file is streamed sentence by sentence (replaces save_data in 2_perplexity.ipynb, which wrote the padded FORM column of a data frame).
+
+        Input:
+            1. filepath (str): Path to the conllup file
+            2. outpath (str): Path to the token file
+        Output:
+            1. n_sents (int): Number of sentences that were written"""
+
+    n_sents = 0
+
+    with open(outpath + ".tmp", mode="w", encoding="UTF-8") as outfile:
+        for forms in iter_sentence_forms(filepath):
+            outfile.write(" ".join(forms) + "\n")
+            n_sents += 1
+    os.replace(outpath + ".tmp", outpath)
+
+    return n_sents
+
+
+######################################
+def save_tokens(path: str, filenames: list, out_dir="data_tmp/perplex/tokens/", force=False):
+    """
+    Function that writes the token files of the Abitur texts for tagging (see extract_tokens). Token files that are newer than the conllup file are skipped.
+
+        Input:
+            1. path (str): Path to the conllup files
+            2. filenames (list): Filenames of the conllup files (str)
+            3. out_dir (str): Directory for the token files. The default value is "data_tmp/perplex/tokens/"
+            4. force (bool): True when all token files should be written again
+        Output:
+            1. written (list): Paths to the token files that were written"""
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    written = list()
+    for filename in filenames:
+        inpath, outpath = os.path.join(path, filename), os.path.join(out_dir, filename)
+        if force or not is_current(inpath, outpath):
+            extract_tokens(inpath, outpath)
+            written.append(outpath)
+
+    return written
+
+
+######################################
+def read_abitext(filepath: str):
+    """
+    Function that reads a token file of an Abitur text and joins the tokens to a text. Token files of save_tokens (one sentence per line) and of save_data
+    in 2_perplexity.ipynb (one token per line, padded with spaces) can be read. In the latter, words that are split into several rows are merged
+    ("<B->" row is kept without prefix, "<I->" and "<E->" rows are deleted), and "<EMPTY>" rows are deleted.
+
+        Input:
+            1. filepath (str): Path to the token file
+        Output:
+            1. text (str): Tokens separated by spaces"""
+
+    tokens = list()
+
+    with open(filepath, mode="r", encoding="UTF-8") as infile:
+        for line in infile:
+            for token in line.split():
+                if token[:4] == "<B->":
+                    tokens.append(token[4:])
+                elif token[:4] in ("<E->", "<I->") or token[:7] == "<EMPTY>":
+                    continue
+                else:
+                    tokens.append(token)
+
+    text = " ".join(tokens) + " " if tokens else ""
+
+    return text
+
+
+######################################
+def read_article(filepath: str):
+    """
+    Function that reads a newspaper file (e.g. data/zeit_1.spl) as one text.
+
+        Input:
+            1. filepath (str): Path to the file
+        Output:
+            1. text (str): Content of the file"""
+
+    with open(filepath, mode="r", encoding="UTF-8") as infile:
+        text = infile.read()
+
+    return text
+
+
+######################################
+def split_file(job: tuple):
+    """
+    Function that reads one file and splits it into sentences and tokens with the tagger of the worker process.
+
+        Input:
+            1. job (tuple): (reader function, path to the input file, path to the output file)
+        Output:
+            1. sentences (list): Tokens of every sentence (list of str)"""
+
+    reader, inpath, _ = job
+
+    return TAGGER.split_text(reader(inpath))
+
+
+######################################
+def tag_batch(sentences: list):
+    """
+    Function that tags a batch of sentences with the tagger of the worker process.
+
+        Input:
+            1. sentences (list): Tokens of every sentence (list of str)
+        Output:
+            1. tags (list): POS tags of every sentence (list of str)"""
+
+    return TAGGER.tag_sentences(sentences)
+
+
+######################################
+def write_tags(tags: list, outpath: str):
+    """
+    Function that writes the POS tags of every sentence in one line (each tag followed by a space, as in 2_perplexity.ipynb).
+    The tags are written to a temporary file first, so that an interrupted run does not leave an output file that looks up to date.
+
+        Input:
+            1. tags (list): POS tags of every sentence (list of str)
+            2. outpath (str): Path to the output file"""
+
+    with open(outpath + ".tmp", mode="w", encoding="UTF-8") as outfile:
+        outfile.write("".join("".join(tag + " " for tag in sentence) + "\n" for sentence in tags))
+    os.replace(outpath + ".tmp", outpath)
+
+
+######################################
+def is_current(inpath: str, outpath: str):
+    """
+    Function that checks whether the output file exists and is newer than the input file.
+
+        Input:
+            1. inpath (str): Path to the input file
+            2. outpath (str): Path to the output file
+        Output:
+            1. current (bool): True when the output file does not have to be created again"""
+
+    return os.path.exists(outpath) and os.path.getmtime(outpath) >= os.path.getmtime(inpath)
+
+
+######################################
+def iter_results(executor, func, items, max_pending: int):
+    """
+    Function that applies func to the items in the worker processes and yields the results in the order of the items. At most max_pending items
+    are submitted at the same time, so that items and results are not collected for the whole corpus (as in SynComplMeas.iter_text_features).
+
+        Input:
+            1. executor (concurrent.futures.ProcessPoolExecutor): Pool of worker processes, or None to apply func in the main process
+            2. func (function): Function that is applied to every item
+            3. items (iterable): Items
+            4. max_pending (int): Maximum number of submitted items whose results have not been yielded
+        Output:
+            1. results (generator): Results of func"""
+
+    if executor is None:
+        yield from map(func, items)
+        return
+
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        # wait for the oldest item when enough items are waiting
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+######################################
+def iter_batches(jobs: list, file_sents, batch_size: int, files: deque):
+    """
+    Function that yields batches of batch_size sentences over the sentences of all files. When the sentences of a file are read, (path to the output file,
+    number of sentences) is appended to files before the batches with these sentences are yielded.
+
+        Input:
+            1. jobs (list): Tuples (reader function, path to the input file, path to the output file)
+            2. file_sents (iterable): Sentences of every file in the order of jobs (see split_file)
+            3. batch_size (int): Number of sentences per batch
+            4. files (collections.deque): Output files whose tags have not been written
+        Output:
+            1. batches (generator): Tokens of every sentence of a batch (list of str)"""
+
+    batch = list()
+    for (_, _, outpath), sents in zip(jobs, file_sents):
+        files.append((outpath, len(sents)))
+        for sentence in sents:
+            batch.append(sentence)
+            if len(batch) == batch_size:
+                yield batch
+                batch = list()
+    if batch:
+        yield batch
+
+
+######################################
+def tag_files(jobs: list, factory=SoMeWeTaTagger, args=(), workers=1, batch_size=500, force=False):
+    """
+    Function that tags files in a pool of worker processes; every worker loads the tagger once. The files are split into sentences,
+    the sentences of all files are tagged in batches of batch_size sentences, and the tags are written per file in the order of the sentences
+    as soon as all sentences of the file are tagged. Files and batches are passed to the workers through bounded iterators (see iter_results),
+    so only the sentences of the files and batches in progress are kept in the main process. Output files that are up to date are skipped.
+
+        Input:
+            1. jobs (list): Tuples (reader function, path to the input file, path to the output file)
+            2. factory (class or function): Creates the tagger. The default value is SoMeWeTaTagger
+            3. args (tuple): Arguments of the factory, e.g. (path to the SoMeWeTa model,)
+            4. workers (int): Number of worker processes. The default value is 1 (no worker processes)
+            5. batch_size (int): Number of sentences per batch. The default value is 500
+            6. force (bool): True when all files should be tagged again
+        Output:
+            1. tagged (list): Paths to the output files that were written, in the order of jobs"""
+
+    jobs = [job for job in jobs if force or not is_current(job[1], job[2])]
+
+    if not jobs:
+        return list()
+
+    def write_next(file_tags: list):
+        # writes the tags of the oldest output file and returns the tags of the following files
+        outpath, n_sents = files.popleft()
+        os.makedirs(os.path.dirname(outpath) or ".", exist_ok=True)
+        write_tags(file_tags[:n_sents], outpath)
+        return file_tags[n_sents:]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(factory, args)) if workers > 1 else nullcontext() as executor:
+        if executor is None:
+            init_worker(factory, args)
+
+        # batches over the sentences of all files, so that short and long files are distributed evenly over the workers
+        files = deque()
+        file_sents = iter_results(executor, split_file, jobs, 2*workers)
+        batches = iter_batches(jobs, file_sents, batch_size, files)
+
+        file_tags = list()
+        for batch_tags in iter_results(executor, tag_batch, batches, 2*workers):
+            file_tags.extend(batch_tags)
+            while files and len(file_tags) >= files[0][1]:
+                file_tags = write_next(file_tags)
+
+    # files without sentences at the end
+    while files:
+        file_tags = write_next(file_tags)
+
+    return [outpath for _, _, outpath in jobs]
+
+
+######################################
+def tag_abitexts(tokens_dir: str, out_dir="data_tmp/perplex/tagged/", **options):
+    """
+    Function that tags all token files of the Abitur texts in tokens_dir (output of save_data in 2_perplexity.ipynb).
+
+        Input:
+            1. tokens_dir (str): Directory of the token files, e.g. "data_tmp/perplex/tokens/"
+            2. out_dir (str): Directory for the tagged files. The default value is "data_tmp/perplex/tagged/"
+            3. options: Keyword arguments of tag_files (factory, args, workers, batch_size, force)
+        Output:
+            1. tagged (list): Paths to the output files that were written"""
+
+    jobs = [(read_abitext, os.path.join(tokens_dir, filename), os.path.join(out_dir, filename)) for filename in sorted(os.listdir(tokens_dir))]
+
+    return tag_files(jobs, **options)
+
+
+######################################
+def tag_articles(data_dir: str, filenames: list, out_dir: str, **options):
+    """
+    Function that tags newspaper files, e.g. ["zeit_1.spl", "zeit_2.spl", "zeit_3.spl"].
+
+        Input:
+            1. data_dir (str): Directory of the files, e.g. "data/"
+            2. filenames (list): Filenames (str)
+            3. out_dir (str): Directory for the tagged files, e.g. "data_tmp/perplex/tagged/zeit/"
+            4. options: Keyword arguments of tag_files (factory, args, workers, batch_size, force)
+        Output:
+            1. tagged (list): Paths to the output files that were written"""
+
+    jobs = [(read_article, os.path.join(data_dir, filename), os.path.join(out_dir, filename)) for filename in filenames]
+
+    return tag_files(jobs, **options)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="POS-tag Abitur texts or newspaper articles for the perplexity experiment.")
+    parser.add_argument("--extract", help="directory of the conllup files of the Abitur texts; writes the token files to --out (default data_tmp/perplex/tokens/)")
+    parser.add_argument("--splits", default="src/demo_dataSplits.csv", help="file with the data split for --extract")
+    parser.add_argument("--abitexts", help="directory of the token files of the Abitur texts")
+    parser.add_argument("--articles", nargs="+", help="directory of the newspaper files followed by the filenames")
+    parser.add_argument("--out", help="output directory (default data_tmp/perplex/tagged/)")
+    parser.add_argument("--model", default="/tmp/german_newspaper_2020-05-28.model", help="SoMeWeTa model")
+    parser.add_argument("--stub", action="store_true", help="use StubTagger instead of SoMeWeTa (for tests)")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--batch-size", type=int, default=500, help="number of sentences per batch")
+    parser.add_argument("--force", action="store_true", help="tag files again even if the output is up to date")
+    args = parser.parse_args()
+
+    if args.extract:
+        written = save_tokens(args.extract, sorted(get_filenames(args.splits, test=True)), args.out or "data_tmp/perplex/tokens/", force=args.force)
+        print("extracted %d files" % len(written))
+        sys.exit()
+
+    args.out = args.out or "data_tmp/perplex/tagged/"
+    options = {"factory": StubTagger, "args": ()} if args.stub else {"factory": SoMeWeTaTagger, "args": (args.model,)}
+
+    if args.abitexts:
+        tagged = tag_abitexts(args.abitexts, args.out, workers=args.workers, batch_size=args.batch_size, force=args.force, **options)
+    elif args.articles:
+        tagged = tag_articles(args.articles[0], args.articles[1:], args.out, workers=args.workers, batch_size=args.batch_size, force=args.force, **options)
+    else:
+        parser.error("either --abitexts or --articles is required")
+
+    print("tagged %d files" % len(tagged))
+    for outpath in tagged:
+        print(outpath)
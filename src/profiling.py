@@ -0,0 +1,137 @@
+# opt-in instrumentation for finding slow features and texts in a run
+# records wall time, calls and tokens per phase ("load", "features"), feature and text, e.g.:
+#   profiler = Profiler()
+#   df_dict = make_df_dict(path, filenames, profiler=profiler)
+#   sc = SynComplMeas(name, df_dict, workers=4, profiler=profiler)
+#   profiler.summary()                       # one row per feature
+#   profiler.write_trace("data_tmp/trace.json")   # view with chrome://tracing or ui.perfetto.dev
+
+# import modules
+import os
+import json
+import time
+from contextlib import contextmanager, nullcontext
+import pandas as pd
+
+# columns of the recorded timings
+RECORD_COLUMNS = ["PHASE", "FEATURE", "DOC", "START", "SECONDS", "CALLS", "TOKENS", "PID"]
+
+
+class Profiler:
+    """
+    A class to record timings of the loading phase and of the features of every text.
+
+    Attributes
+    ----------
+    records : list
+        One dictionary per timed step with the keys in RECORD_COLUMNS
+
+    Methods
+    -------
+    record(phase: str, feature: str, doc, tokens: int):
+        Context manager that times a step and saves it as a record.
+    merge(records: list):
+        Adds records from another profiler, e.g. of a worker process.
+    to_df():
+        Returns all records as data frame.
+    summary(by: str or list):
+        Returns the summed timings per feature (or per text, phase, ...).
+    write_trace(filepath: str):
+        Writes the records as trace file in the Chrome trace event format.
+    """
+    def __init__(self):
+        self.records = list()
+
+    @contextmanager
+    def record(self, phase: str, feature: str, doc=None, tokens=0):
+        """
+        Context manager that measures the wall time of the enclosed code and saves it as a record.
+        The record is returned, so the number of tokens can also be set when it is only known at the end of the step.
+
+        Input:
+            1. phase (str): Phase of the run, e.g. "load" or "features"
+            2. feature (str): Name of the feature or step, e.g. "tok_embeds" or "scan_nodes"
+            3. doc (tuple): Key of the text, e.g. (year, text number)
+            4. tokens (int): Number of tokens processed in the step
+        Output:
+            1. entry (dict): Record of the step"""
+
+        entry = {"PHASE": phase, "FEATURE": feature, "DOC": doc, "START": time.time(), "SECONDS": 0.0, "CALLS": 1, "TOKENS": tokens, "PID": os.getpid()}
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["SECONDS"] = time.perf_counter() - start
+            self.records.append(entry)
+
+    def merge(self, records: list):
+        """
+        Adds records, e.g. the records a worker process returned with the features of a text.
+
+        Input:
+            1. records (list): Records (dict)"""
+
+        self.records.extend(records)
+
+    def to_df(self):
+        """
+        Returns all records as data frame, one row per timed step.
+
+        Output:
+            1. df (Pandas.DataFrame): Data frame with the columns in RECORD_COLUMNS"""
+
+        return pd.DataFrame(self.records, columns=RECORD_COLUMNS)
+
+    def summary(self, by=["PHASE", "FEATURE"]):
+        """
+        Sums up wall time and calls and calculates tokens per second, sorted by wall time.
+        The tokens of a text are counted once per group, even if several steps of the text are in the group.
+
+        Input:
+            1. by (str or list): Column(s) to group by, e.g. "DOC" for the slowest texts. The default value is ["PHASE", "FEATURE"]
+        Output:
+            1. df_summary (Pandas.DataFrame): Data frame with the columns SECONDS, CALLS, TOKENS and TOKENS_PER_SEC"""
+
+        by = [by] if isinstance(by, str) else list(by)
+
+        df = self.to_df()
+        # keys of texts are tuples, which cannot be sorted together with None
+        df["DOC"] = df.DOC.astype(str)
+        df_summary = df.groupby(by)[["SECONDS", "CALLS"]].sum()
+        df_summary["TOKENS"] = df.drop_duplicates(list(dict.fromkeys(by + ["DOC"]))).groupby(by).TOKENS.sum()
+        df_summary["TOKENS_PER_SEC"] = df_summary.TOKENS / df_summary.SECONDS
+
+        return df_summary.sort_values("SECONDS", ascending=False)
+
+    def write_trace(self, filepath: str):
+        """
+        Writes the records as complete events of the Chrome trace event format (one track per process).
+
+        Input:
+            1. filepath (str): Path of the trace file, e.g. "data_tmp/trace.json\""""
+
+        events = [{"name": entry["FEATURE"], "cat": entry["PHASE"], "ph": "X", "ts": entry["START"]*1e6, "dur": entry["SECONDS"]*1e6,
+                   "pid": entry["PID"], "tid": 0, "args": {"doc": str(entry["DOC"]), "tokens": int(entry["TOKENS"])}}
+                  for entry in self.records]
+
+        with open(filepath, "w", encoding="UTF-8") as outfile:
+            json.dump({"traceEvents": events}, outfile)
+
+
+def timed(profiler, phase: str, feature: str, doc=None, tokens=0):
+    """
+    Returns the timing context of the profiler, or a context that does nothing when no profiler is given (instrumentation switched off).
+
+        Input:
+            1. profiler (Profiler or None): Profiler that records the step
+            2. phase (str): Phase of the run
+            3. feature (str): Name of the feature or step
+            4. doc (tuple): Key of the text
+            5. tokens (int): Number of tokens processed in the step
+        Output:
+            1. context manager, yields the record (dict) or None"""
+
+    if profiler is None:
+        return nullcontext()
+
+    return profiler.record(phase, feature, doc, tokens)
@@ -0,0 +1,193 @@
+# long-format store of the per-text results of the complexity features in one Parquet file (results/results.parquet)
+# one row per corpus, data split, feature, year and text with the columns CORPUS, SPLIT, FEATURE, YEAR, DOC, VALUE
+# replaces the result files with one .csv per feature, where the text values are stored as list in STUDENT_VALS and had to be parsed again
+# by collect_syn_results.py and boxplots.py; yearly statistics are aggregate views of the stored values (see read_year_stats)
+
+# usage (call from root dir):
+# python3 src/result_store.py results/3_syntax/test_results/ --corpus abitur --split test     (import result files of 3_syntactic_complexity.ipynb)
+# (3_syntactic_complexity.ipynb also writes its results to the store; import_csv_results imports result files that are newer than the store)
+# in Python, e.g. after SynComplMeas:
+# from result_store import write_results, read_results
+# write_results(sc.values, "abitur", "test")
+# df = read_results(corpus="abitur", split="test", features=["nx_s", "vv_nn"])
+
+# import modules
+import os
+import sys
+import ast
+import argparse
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from calc_syn_complexity import aggregate_years, make_result_dfs
+
+STORE_FILE = "results/results.parquet"
+STORE_COLUMNS = ["CORPUS", "SPLIT", "FEATURE", "YEAR", "DOC", "VALUE"]
+
+
+######################################
+def read_results(store_file=STORE_FILE, corpus=None, split=None, features=None, columns=None):
+    """
+    Function that reads results from the store. Only the wanted rows and columns are read from the Parquet file.
+
+        Input:
+            1. store_file (str): Path to the store file. The default value is "results/results.parquet"
+            2. corpus (str): Corpus, e.g. "abitur" or "express_zeit". The default value is None (all corpora)
+            3. split (str): Data split, e.g. "test", "dev" or "demo". The default value is None (all splits)
+            4. features (list): Names of the features (str). The default value is None (all features)
+            5. columns (list): Columns to read. The default value is None (all columns)
+        Output:
+            1. df (Pandas.DataFrame): Data frame with the wanted rows and columns (empty if the store does not exist)"""
+
+    if not os.path.exists(store_file):
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in zip(STORE_COLUMNS, [object, object, object, "int64", "int64", "float64"])})[columns or STORE_COLUMNS]
+
+    filters = list()
+    if corpus is not None:
+        filters.append(("CORPUS", "==", corpus))
+    if split is not None:
+        filters.append(("SPLIT", "==", split))
+    if features is not None:
+        filters.append(("FEATURE", "in", list(features)))
+
+    df = pd.read_parquet(store_file, columns=columns, filters=filters or None)
+
+    return df
+
+
+######################################
+def write_results(df_long: pd.DataFrame, corpus: str, split: str, store_file=STORE_FILE):
+    """
+    Function that writes the text values of features to the store. Stored values of the same corpus, split and features are replaced.
+
+        Input:
+            1. df_long (Pandas.DataFrame): Data frame with the columns FEATURE, YEAR, DOC, VALUE (e.g. SynComplMeas.values)
+            2. corpus (str): Corpus, e.g. "abitur"
+            3. split (str): Data split, e.g. "test"
+            4. store_file (str): Path to the store file. The default value is "results/results.parquet"
+        Output:
+            1. store (Pandas.DataFrame): Complete store after writing"""
+
+    new = df_long[["FEATURE", "YEAR", "DOC", "VALUE"]].astype({"YEAR": "int64", "DOC": "int64", "VALUE": "float64"})
+    new.insert(0, "SPLIT", split)
+    new.insert(0, "CORPUS", corpus)
+
+    store = read_results(store_file)
+    replaced = (store.CORPUS == corpus) & (store.SPLIT == split) & store.FEATURE.isin(set(new.FEATURE))
+    store = pd.concat([store[~replaced], new], ignore_index=True)
+
+    os.makedirs(os.path.dirname(store_file) or ".", exist_ok=True)
+    # write to a temporary file first, so that the store is never incomplete
+    store.to_parquet(store_file + ".tmp", index=False)
+    os.replace(store_file + ".tmp", store_file)
+
+    return store
+
+
+######################################
+def read_year_stats(store_file=STORE_FILE, corpus=None, split=None, features=None):
+    """
+    Function that returns the yearly statistics of the stored values (aggregate view, see calc_syn_complexity.aggregate_years).
+
+        Input:
+            1. store_file (str): Path to the store file. The default value is "results/results.parquet"
+            2. corpus (str): Corpus. The default value is None (all corpora)
+            3. split (str): Data split. The default value is None (all splits)
+            4. features (list): Names of the features (str). The default value is None (all features)
+        Output:
+            1. df_years (Pandas.DataFrame): Data frame with the columns FEATURE, YEAR, YEAR_VAL, STUDENT_STD, YEARS_MEAN, YEARS_STD"""
+
+    df_years = aggregate_years(read_results(store_file, corpus, split, features, columns=["FEATURE", "YEAR", "DOC", "VALUE"]))
+
+    return df_years
+
+
+######################################
+def read_result_dfs(store_file=STORE_FILE, corpus=None, split=None, features=None):
+    """
+    Function that returns the stored results in the format of the former result files (one data frame per feature with the columns
+    YEAR, YEAR_VAL, STUDENT_VALS, STUDENT_STD, YEARS_MEAN, YEARS_STD, see calc_syn_complexity.make_result_dfs).
+
+        Input:
+            1. store_file (str): Path to the store file. The default value is "results/results.parquet"
+            2. corpus (str): Corpus. The default value is None (all corpora)
+            3. split (str): Data split. The default value is None (all splits)
+            4. features (list): Names of the features (str). The default value is None (all features)
+        Output:
+            1. results_dict (dict): Dictionary with key = feature name (str) and value = result data frame"""
+
+    df_long = read_results(store_file, corpus, split, features, columns=["FEATURE", "YEAR", "DOC", "VALUE"])
+
+    return make_result_dfs(df_long, aggregate_years(df_long))
+
+
+######################################
+def read_csv_results(input_dir: str):
+    """
+    Function that reads the result files of 3_syntactic_complexity.ipynb (one .csv per feature, text values as list in STUDENT_VALS) in long format,
+    so that existing results can be imported into the store. The texts of a year are numbered from 1 in the order of STUDENT_VALS.
+    Files without the column STUDENT_VALS are skipped.
+
+        Input:
+            1. input_dir (str): Directory with the result files, e.g. "results/3_syntax/test_results/"
+        Output:
+            1. df_long (Pandas.DataFrame): Data frame with the columns FEATURE, YEAR, DOC, VALUE"""
+
+    rows = list()
+
+    for filename in sorted(os.listdir(input_dir)):
+        if not filename.endswith(".csv"):
+            continue
+        df = pd.read_csv(os.path.join(input_dir, filename))
+        # skip other files in the directory, e.g. express_zeit.csv
+        if "STUDENT_VALS" not in df.columns:
+            continue
+        for year, student_vals in zip(df.YEAR, df.STUDENT_VALS):
+            for i, val in enumerate(ast.literal_eval(student_vals)):
+                rows.append([filename[:-4], year, i+1, val])
+
+    df_long = pd.DataFrame(rows, columns=["FEATURE", "YEAR", "DOC", "VALUE"]).astype({"YEAR": "int64", "DOC": "int64", "VALUE": "float64"})
+
+    return df_long
+
+
+######################################
+def import_csv_results(input_dir: str, corpus: str, split: str, store_file=STORE_FILE, force=False):
+    """
+    Function that imports the result files of a directory (see read_csv_results) into the store if the store has no results for the corpus and split yet,
+    or if a result file is newer than the store (e.g. 3_syntactic_complexity.ipynb has been run again without writing to the store).
+
+        Input:
+            1. input_dir (str): Directory with the result files, e.g. "results/3_syntax/test_results/"
+            2. corpus (str): Corpus, e.g. "abitur"
+            3. split (str): Data split, e.g. "test"
+            4. store_file (str): Path to the store file. The default value is "results/results.parquet"
+            5. force (bool): True when the result files should be imported in any case. The default value is False
+        Output:
+            1. imported (bool): True if the result files have been imported"""
+
+    if not force and os.path.exists(store_file):
+        store_time = os.path.getmtime(store_file)
+        csv_times = [os.path.getmtime(os.path.join(input_dir, filename)) for filename in os.listdir(input_dir) if filename.endswith(".csv")]
+        stored = not read_results(store_file, corpus, split, columns=["FEATURE"]).empty
+        if stored and all(csv_time <= store_time for csv_time in csv_times):
+            return False
+
+    write_results(read_csv_results(input_dir), corpus, split, store_file)
+
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import result files with one .csv per feature into the long-format result store.")
+    parser.add_argument("input_dir", help="directory with the result files, e.g. results/3_syntax/test_results/")
+    parser.add_argument("--corpus", default="abitur", help="name of the corpus")
+    parser.add_argument("--split", default="test", help="name of the data split")
+    parser.add_argument("--store", default=STORE_FILE, help="store file")
+    args = parser.parse_args()
+
+    import_csv_results(args.input_dir, args.corpus, args.split, args.store, force=True)
+    store = read_results(args.store)
+
+    print(store.groupby(["CORPUS", "SPLIT"]).FEATURE.agg(["nunique", "size"]))
@@ -0,0 +1,259 @@
+# integer-encoded representation of the syntax column (e.g. "I-SIMPX|B-VF|B-NX|ART") for the syntactic complexity measures
+# node tags are split into a node label ("SIMPX", "R-SIMPX", "NX", "ART", ...) and a BIO flag, labels are replaced by ids from a shared vocabulary,
+# and the node tags of all tokens are stored in flat arrays with offsets per token (CSR layout), so features can be calculated with NumPy
+
+# import modules
+import re
+import numpy as np
+
+# BIO flags of node tags: node tag without prefix (one-token node), B- (beginning), I- (inside), E- (end)
+NO_PREFIX, B, I, E = 0, 1, 2, 3
+PREFIXES = {"B-": B, "I-": I, "E-": E}
+
+
+class LabelVocab:
+    """
+    A class to represent the vocabulary of node labels that is shared by all texts.
+
+    Attributes
+    ----------
+    labels : list
+        Node labels (str), the position in the list is the label id
+    label_ids : dict
+        Dictionary with key = node label (str) and value = label id (int)
+    tag_codes : dict
+        Dictionary with key = node tag (str) and value = code (int) = 4 * label id + BIO flag
+
+    Methods
+    -------
+    encode(tags: list):
+        Returns the codes of node tags and adds unknown labels to the vocabulary.
+    get_label_mask(regex: str):
+        Returns a boolean array that is True for all label ids whose label matches a regular expression.
+    get_set_mask(labels: set):
+        Returns a boolean array that is True for all label ids whose label is in a set.
+    """
+    def __init__(self):
+        self.labels = list()
+        self.label_ids = dict()
+        self.tag_codes = dict()
+        self._masks = dict()
+
+    def add_tag(self, tag: str):
+        """
+        Splits a node tag into BIO flag and node label, adds the label to the vocabulary if it is unknown and returns the code of the tag.
+
+        Input:
+            1. tag (str): Node tag, e.g. "B-R-SIMPX"
+        Output:
+            1. code (int): 4 * label id + BIO flag"""
+
+        prefix = PREFIXES.get(tag[:2], NO_PREFIX) if len(tag) > 2 else NO_PREFIX
+        label = tag[2:] if prefix != NO_PREFIX else tag
+
+        if label not in self.label_ids:
+            self.label_ids[label] = len(self.labels)
+            self.labels.append(label)
+
+        code = 4*self.label_ids[label] + prefix
+        self.tag_codes[tag] = code
+
+        return code
+
+    def encode(self, tags: list):
+        """
+        Returns the codes of a list of node tags as array. Unknown node labels are added to the vocabulary.
+
+        Input:
+            1. tags (list): Node tags (str)
+        Output:
+            1. codes (numpy.ndarray): Codes (4 * label id + BIO flag) of the node tags"""
+
+        # add unknown tags first, so that every tag can be looked up afterwards
+        for tag in set(tags).difference(self.tag_codes):
+            self.add_tag(tag)
+
+        codes = np.fromiter(map(self.tag_codes.__getitem__, tags), dtype=np.int64, count=len(tags))
+
+        return codes
+
+    def get_label_mask(self, regex: str):
+        """
+        Returns a boolean array that is True for all label ids whose node label starts with a match of the regular expression.
+        The masks are cached and only calculated again when the vocabulary has grown.
+
+        Input:
+            1. regex (str): Regular expression for a node label
+        Output:
+            1. mask (numpy.ndarray): Boolean array with one value per label id"""
+
+        mask = self._masks.get(regex)
+
+        if mask is None or len(mask) < len(self.labels):
+            label_RE = re.compile(regex)
+            mask = np.fromiter((label_RE.match(label) is not None for label in self.labels), dtype=bool, count=len(self.labels))
+            self._masks[regex] = mask
+
+        return mask
+
+    def get_set_mask(self, labels: set):
+        """
+        Returns a boolean array that is True for all label ids whose node label is in a set of labels (cached like get_label_mask).
+
+        Input:
+            1. labels (set): Node labels (str)
+        Output:
+            1. mask (numpy.ndarray): Boolean array with one value per label id"""
+
+        key = frozenset(labels)
+        mask = self._masks.get(key)
+
+        if mask is None or len(mask) < len(self.labels):
+            mask = np.fromiter((label in key for label in self.labels), dtype=bool, count=len(self.labels))
+            self._masks[key] = mask
+
+        return mask
+
+
+# vocabulary used by default by all texts
+LABELS = LabelVocab()
+
+
+class SyntaxArrays:
+    """
+    A class to represent the syntax column of a text as integer arrays.
+
+    Attributes
+    ----------
+    vocab : LabelVocab
+        Vocabulary of the node labels
+    label_ids : numpy.ndarray
+        Label id of every node tag, node tags of all tokens after each other (int32)
+    bio : numpy.ndarray
+        BIO flag of every node tag (int8, see NO_PREFIX, B, I, E)
+    offsets : numpy.ndarray
+        Start of the node tags of every token, the node tags of token i are label_ids[offsets[i]:offsets[i+1]] (int64)
+
+    Methods
+    -------
+    from_column(syntax: Pandas.Series, vocab: LabelVocab):
+        Encodes the syntax column of a text.
+    count_nodes(regex: str, flags: tuple):
+        Counts node tags with BIO flags in flags whose node label matches a regular expression.
+    count_node_runs(regex: str, flags: tuple):
+        Counts node tags like count_nodes, but only every second one of adjacent matching node tags of a token.
+    get_depths(skip_labels: set):
+        Returns the embedding depth of every token.
+    """
+    def __init__(self, vocab: LabelVocab, label_ids: np.ndarray, bio: np.ndarray, offsets: np.ndarray):
+        self.vocab = vocab
+        self.label_ids = label_ids
+        self.bio = bio
+        self.offsets = offsets
+        self._tag_counts = None
+
+    @classmethod
+    def from_column(cls, syntax, vocab=LABELS):
+        """
+        Encodes the syntax column of a text in one pass: all cells are split into node tags at once and the node tags are looked up in the vocabulary.
+
+        Input:
+            1. syntax (Pandas.Series or list): Syntax column of a text, one string of node tags separated by "|" per token
+            2. vocab (LabelVocab): Vocabulary of the node labels. The default value is the shared vocabulary LABELS
+        Output:
+            1. syn (SyntaxArrays): Encoded syntax column"""
+
+        cells = list(syntax)
+
+        # number of node tags per token = number of separators + 1
+        node_counts = np.fromiter((cell.count("|") + 1 for cell in cells), dtype=np.int64, count=len(cells))
+        offsets = np.zeros(len(cells) + 1, dtype=np.int64)
+        np.cumsum(node_counts, out=offsets[1:])
+
+        codes = vocab.encode("|".join(cells).split("|")) if cells else np.zeros(0, dtype=np.int64)
+
+        return cls(vocab, (codes >> 2).astype(np.int32), (codes & 3).astype(np.int8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def get_tag_counts(self):
+        """
+        Returns the frequency of every combination of label id and BIO flag in the text (calculated once).
+
+        Output:
+            1. tag_counts (numpy.ndarray): Array of the shape (number of labels, 4)"""
+
+        if self._tag_counts is None or self._tag_counts.shape[0] < len(self.vocab.labels):
+            codes = 4*self.label_ids.astype(np.int64) + self.bio
+            self._tag_counts = np.bincount(codes, minlength=4*len(self.vocab.labels)).reshape(-1, 4)
+
+        return self._tag_counts
+
+    def count_nodes(self, regex: str, flags=(NO_PREFIX, B)):
+        """
+        Counts node tags whose BIO flag is in flags and whose node label starts with a match of the regular expression.
+        With the default flags, this is the same as counting r"(^|\|)(B-)?" + regex in the syntax column (one count per node).
+
+        Input:
+            1. regex (str): Regular expression for a node label
+            2. flags (tuple): BIO flags of the node tags to count. Use (NO_PREFIX, B, I, E) to count all node tags of the nodes
+        Output:
+            1. node_count (numpy.int64): Number of matching node tags"""
+
+        tag_counts = self.get_tag_counts()
+        mask = self.vocab.get_label_mask(regex)
+
+        node_count = tag_counts[:len(mask)][mask][:, list(flags)].sum()
+
+        return node_count
+
+    def count_node_runs(self, regex: str, flags=(NO_PREFIX, B)):
+        """
+        Counts node tags like count_nodes, but of adjacent matching node tags of one token (e.g. "B-C|C") only the first, third, ... node tag is counted.
+        This is the same as counting a regex that also consumes the following separator, e.g. r"(^|\|)(B-)?C($|\|)": the separator between two
+        adjacent matches is consumed by the first match, so the second node tag cannot match.
+
+        Input:
+            1. regex (str): Regular expression for a node label
+            2. flags (tuple): BIO flags of the node tags to count
+        Output:
+            1. node_count (numpy.int64): Number of counted node tags"""
+
+        label_mask = self.vocab.get_label_mask(regex)
+        if not len(self.label_ids) or not label_mask.any():
+            return np.int64(0)
+
+        mask = label_mask[self.label_ids] & np.isin(self.bio, flags)
+
+        # a run of matching node tags starts at a matching node tag whose previous node tag in the same token does not match
+        prev = np.zeros(len(mask), dtype=bool)
+        prev[1:] = mask[:-1]
+        prev[self.offsets[:-1][self.offsets[:-1] < len(mask)]] = False
+        positions = np.arange(len(mask))
+        run_starts = np.maximum.accumulate(np.where(mask & ~prev, positions, 0))
+
+        # position of every node tag in its run, every second node tag is counted
+        node_count = (mask & ((positions - run_starts) % 2 == 0)).sum()
+
+        return np.int64(node_count)
+
+    def get_depths(self, skip_labels=frozenset()):
+        """
+        Returns the embedding depth of every token = number of node tags of the token without node tags whose label is in skip_labels.
+        The first node tag of a token is always counted.
+
+        Input:
+            1. skip_labels (set): Node labels that are not counted, e.g. topological fields
+        Output:
+            1. depths (numpy.ndarray): Embedding depth of every token (int64)"""
+
+        depths = np.diff(self.offsets)
+
+        if skip_labels and len(self.label_ids):
+            skip = self.vocab.get_set_mask(skip_labels)[self.label_ids]
+            # the first node tag of every token is never skipped
+            skip[self.offsets[:-1]] = False
+            depths = depths - np.add.reduceat(skip.astype(np.int64), self.offsets[:-1])
+
+        return depths
@@ -0,0 +1,232 @@
+# convert bracketed constituency trees (Berkeley parser output, data/*.parsed, one tree per line) into the per-token BIO column SYNTAX
+# replaces the conversion with C6C (tuebatrees, treetobio) and the removal of the PSEUDO tags in make_corp_dict of 3_syntactic_complexity.ipynb:
+# every tree is read in one pass with a stack of the open constituents, PSEUDO nodes are dropped while converting
+# SYNTAX of a token = labels of all constituents above the token (without the root and the POS tag), "B-" for the first token of a constituent, otherwise "I-"
+
+# usage (call from root dir):
+# python3 src/tree_to_bio.py data/ express_1.parsed express_2.parsed express_3.parsed zeit_1.parsed zeit_2.parsed zeit_3.parsed --out data_tmp/syntax/corpus/
+# python3 src/tree_to_bio.py data/ express_1.parsed zeit_1.parsed --out data_tmp/syntax/corpus/ --format parquet --workers 4
+
+# import modules
+import os
+import re
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import numpy as np
+
+# preterminal "(TAG word)" (the word can be a single bracket, e.g. "(NN ()"), opening bracket with label, closing bracket
+TREE_REGEX = re.compile(r"\(([^\s()]+) (\(|\)|[^\s()]+)\)|\(([^\s()]*)|(\))")
+
+# columns of the written conllup files (the ten CoNLL-U columns and SYNTAX)
+CONLLUP_COLUMNS = ["ID", "FORM", "LEMMA", "UPOS", "XPOS", "FEATS", "HEAD", "DEPREL", "DEPS", "MISC", "SYNTAX"]
+
+
+######################################
+def parse_tree(tree: str, drop_labels=("PSEUDO",)):
+    """
+    Function that converts one bracketed tree into tokens with POS tag and BIO annotation in a single pass.
+
+        Input:
+            1. tree (str): Bracketed tree, e.g. "( (PSEUDO (NX (ADJX (ADJA Heftiger)) (NN Regen)) ($. .)) )"
+            2. drop_labels (tuple): Labels of nodes that are left out of the annotation. The default value is ("PSEUDO",)
+        Output:
+            1. tokens (list): Tuples (FORM, XPOS, SYNTAX) with SYNTAX = labels joined by "|" (empty string if the token is in no constituent)"""
+
+    tokens = list()
+
+    # open constituents: labels and whether a token of the constituent has been seen already
+    labels = list()
+    started = list()
+
+    for match in TREE_REGEX.finditer(tree):
+        tag, word, label, close = match.groups()
+
+        if tag is not None:
+            tokens.append((word, tag, "|".join([("I-" if seen else "B-") + lab for lab, seen in zip(labels, started) if lab])))
+            started = [True] * len(started)
+        elif close is not None:
+            labels.pop()
+            started.pop()
+        else:
+            # root (no label) and dropped nodes are kept on the stack with an empty label, so the brackets still match
+            labels.append("" if label in drop_labels else label)
+            started.append(False)
+
+    return tokens
+
+
+######################################
+def iter_parsed(filepath: str, drop_labels=("PSEUDO",)):
+    """
+    Generator that reads a file with one bracketed tree per line and yields the tokens of one sentence at a time.
+
+        Input:
+            1. filepath (str): Path to the file, e.g. "data/express_1.parsed"
+            2. drop_labels (tuple): Labels of nodes that are left out of the annotation. The default value is ("PSEUDO",)
+        Output:
+            1. Lists of tuples (FORM, XPOS, SYNTAX), see parse_tree"""
+
+    with open(filepath, "r", encoding="UTF-8") as file:
+        for line in file:
+            if line.strip():
+                yield parse_tree(line, drop_labels)
+
+
+######################################
+def parsed_to_df(filepath: str, drop_labels=("PSEUDO",)):
+    """
+    Function that converts a file with bracketed trees into a data frame like make_corp_dict in 3_syntactic_complexity.ipynb:
+    tokens without syntax annotation are deleted and sentences are numbered from 0 (sentences without annotated tokens are left out).
+
+        Input:
+            1. filepath (str): Path to the file, e.g. "data/express_1.parsed"
+            2. drop_labels (tuple): Labels of nodes that are left out of the annotation. The default value is ("PSEUDO",)
+        Output:
+            1. df (Pandas.DataFrame): Data frame with the columns FORM, SENT_ID, SYNTAX, XPOS"""
+
+    forms, sent_ids, syntax, xpos = list(), list(), list(), list()
+    sent_id = 0
+
+    for tokens in iter_parsed(filepath, drop_labels):
+        n_before = len(forms)
+        for form, tag, syn in tokens:
+            if syn:
+                forms.append(form)
+                sent_ids.append(sent_id)
+                syntax.append(syn)
+                xpos.append(tag)
+        if len(forms) > n_before:
+            sent_id += 1
+
+    df = pd.DataFrame({"FORM": forms, "SENT_ID": np.array(sent_ids, dtype=np.int64), "SYNTAX": syntax, "XPOS": xpos})
+
+    return df
+
+
+######################################
+def write_conllup(filepath: str, outpath: str, drop_labels=("PSEUDO",)):
+    """
+    Function that converts a file with bracketed trees into a conllup file with the columns ID, FORM, XPOS and SYNTAX (other CoNLL-U columns are "_").
+    Like parsed_to_df, tokens without syntax annotation are left out and sentences without annotated tokens are not written,
+    so that functions.read_conllup returns the same tokens and sentences as parsed_to_df.
+
+        Input:
+            1. filepath (str): Path to the file, e.g. "data/express_1.parsed"
+            2. outpath (str): Path to the conllup file
+            3. drop_labels (tuple): Labels of nodes that are left out of the annotation. The default value is ("PSEUDO",)
+        Output:
+            1. n_sents (int): Number of sentences that were written"""
+
+    n_sents = 0
+
+    with open(outpath + ".tmp", mode="w", encoding="UTF-8") as outfile:
+        outfile.write("# global.columns = " + " ".join(CONLLUP_COLUMNS) + "\n")
+        for tokens in iter_parsed(filepath, drop_labels):
+            tokens = [(form, tag, syn) for form, tag, syn in tokens if syn]
+            if not tokens:
+                continue
+            n_sents += 1
+            outfile.write("# sent_id = %d\n" % n_sents)
+            for i, (form, tag, syn) in enumerate(tokens):
+                outfile.write("%d\t%s\t_\t_\t%s\t_\t_\t_\t_\t_\t%s\n" % (i+1, form, tag, syn))
+            outfile.write("\n")
+    os.replace(outpath + ".tmp", outpath)
+
+    return n_sents
+
+
+######################################
+def convert_file(filepath: str, outpath: str, fmt="conllup", drop_labels=("PSEUDO",)):
+    """
+    Function that converts one file with bracketed trees into a conllup file (see write_conllup) or a Parquet file with the data frame of parsed_to_df.
+
+        Input:
+            1. filepath (str): Path to the file, e.g. "data/express_1.parsed"
+            2. outpath (str): Path to the output file
+            3. fmt (str): "conllup" or "parquet". The default value is "conllup"
+            4. drop_labels (tuple): Labels of nodes that are left out of the annotation. The default value is ("PSEUDO",)
+        Output:
+            1. outpath (str): Path to the output file"""
+
+    if fmt == "conllup":
+        write_conllup(filepath, outpath, drop_labels)
+    elif fmt == "parquet":
+        parsed_to_df(filepath, drop_labels).to_parquet(outpath + ".tmp", index=False)
+        os.replace(outpath + ".tmp", outpath)
+    else:
+        raise ValueError("unknown format: %s" % fmt)
+
+    return outpath
+
+
+######################################
+def convert_corpus(path: str, filenames: list, out_dir: str, fmt="conllup", workers=1, drop_labels=("PSEUDO",)):
+    """
+    Function that converts all files of a corpus, optionally in a pool of worker processes. The output files get the extension of the format
+    (e.g. express_1.parsed -> express_1.conllup).
+
+        Input:
+            1. path (str): Path to the files
+            2. filenames (list): Filenames of the files with bracketed trees (str)
+            3. out_dir (str): Directory for the output files
+            4. fmt (str): "conllup" or "parquet". The default value is "conllup"
+            5. workers (int): Number of worker processes. The default value is 1 (no worker processes)
+            6. drop_labels (tuple): Labels of nodes that are left out of the annotation. The default value is ("PSEUDO",)
+        Output:
+            1. outpaths (list): Paths to the output files, in the order of filenames"""
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    filepaths = [os.path.join(path, filename) for filename in filenames]
+    outpaths = [os.path.join(out_dir, os.path.splitext(filename)[0] + "." + fmt) for filename in filenames]
+
+    if workers <= 1:
+        return [convert_file(filepath, outpath, fmt, drop_labels) for filepath, outpath in zip(filepaths, outpaths)]
+
+    n = len(filepaths)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        outpaths = list(executor.map(convert_file, filepaths, outpaths, [fmt]*n, [drop_labels]*n))
+
+    return outpaths
+
+
+######################################
+def make_corp_dict(path: str, filenames: list, drop_labels=("PSEUDO",)):
+    """
+    Function that converts the Express and Zeit files with bracketed trees and returns a dictionary with key = (corpus ID, text number) and value = data frame
+    (see parsed_to_df). As in 3_syntactic_complexity.ipynb, the corpus ID for Express is 1 and the corpus ID for Zeit is 2.
+
+        Input:
+            1. path (str): Path to the files
+            2. filenames (list): Filenames, e.g. ["express_1.parsed", "zeit_1.parsed"]
+            3. drop_labels (tuple): Labels of nodes that are left out of the annotation. The default value is ("PSEUDO",)
+        Output:
+            1. df_dict (dict): Dictionary with key = tuple (corpus ID, text number) and value = data frame"""
+
+    df_dict = dict()
+
+    for i, filename in enumerate(filenames):
+        # instead of year numbers, use corpora IDs for the first part of the key tuple
+        if filename.startswith("express"):
+            df_dict[(1, i+1)] = parsed_to_df(os.path.join(path, filename), drop_labels)
+        if filename.startswith("zeit"):
+            df_dict[(2, i+1)] = parsed_to_df(os.path.join(path, filename), drop_labels)
+
+    return df_dict
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert bracketed trees into the BIO column SYNTAX.")
+    parser.add_argument("path", help="directory of the files with bracketed trees")
+    parser.add_argument("filenames", nargs="+", help="files with one bracketed tree per line, e.g. express_1.parsed")
+    parser.add_argument("--out", default="data_tmp/syntax/corpus/", help="output directory")
+    parser.add_argument("--format", default="conllup", choices=["conllup", "parquet"], help="format of the output files")
+    parser.add_argument("--keep-pseudo", action="store_true", help="keep the PSEUDO nodes in the annotation")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    args = parser.parse_args()
+
+    drop_labels = () if args.keep_pseudo else ("PSEUDO",)
+
+    for outpath in convert_corpus(args.path, args.filenames, args.out, args.format, args.workers, drop_labels):
+        print(outpath)